@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+'''
+implementation of Bellman Ford algorithm
+
+Bellman Ford algorithm finds the shortest path from one vertex
+to every other vertex, allowing negative edge weights,
+and detects negative cycles
+
+besides the plain version there is SPFA, which only rescans edges
+out of vertices whose distance changed, and a numpy version that
+relaxes every edge of a pass at once with array operations
+
+@author: Gavin Li
+@email: liguangzheng998@hotmail.com
+@created: 10182026
+'''
+
+from collections import deque
+from typing import List, Optional, Tuple, Union
+import time
+
+try:
+    import numpy as np
+except ImportError: ## bellman_ford_numpy is unavailable without numpy
+    np = None
+
+INF: "int" = 10**18
+
+def bellman_ford(
+    n: "int",
+    edges: "List[Tuple[int, int, int]]",
+    src: "Optional[int]"=None
+) -> "Tuple[List[int], List[int], List[int]]":
+    '''
+    Bellman Ford algorithm
+
+    Params
+    ----------
+        n int: number of vertices
+        edges List[Tuple[int, int, int]]: (start, end, weight) of each edge
+        src Optional[int]: index of the source vertex,
+            None for a virtual source with a 0 edge to every vertex,
+            which finds negative cycles anywhere in the graph
+
+    Returns
+    ----------
+        Tuple[List[int], List[int], List[int]] : three lists
+            distance from the source to each vertex, INF if unreachable
+            previous vertex on the shortest path, -1 if none
+            vertices of a negative cycle in order, empty if none
+    '''
+    dist = [INF] * n
+    prev = [-1] * n
+    if src is None:
+        dist = [0] * n
+    elif n:
+        dist[src] = 0
+    ## a shortest path has at most n - 1 edges
+    for _ in range(n - 1):
+        updated = False
+        for (u, v, w) in edges:
+            if dist[u] < INF and dist[u] + w < dist[v]:
+                dist[v] = dist[u] + w
+                prev[v] = u
+                updated = True
+        ## nothing changed, nothing will change
+        if not updated:
+            return (dist, prev, [])
+    ## still improving after n - 1 passes => negative cycle
+    for (u, v, w) in edges:
+        if dist[u] < INF and dist[u] + w < dist[v]:
+            prev[v] = u
+            return (dist, prev, find_cycle(prev, v))
+    return (dist, prev, [])
+
+def find_cycle(prev: "List[int]", v: "int") -> "List[int]":
+    '''
+    extract the cycle that v leads to in the predecessor array
+
+    Params
+    ----------
+        prev List[int]: previous vertex of each vertex
+        v int: a vertex on or behind a cycle
+
+    Returns
+    ----------
+        List[int] : vertices of the cycle in order along the edges
+    '''
+    ## walking back n times surely lands on the cycle
+    for _ in range(len(prev)):
+        v = prev[v]
+        ## the chain ended, look for a cycle anywhere else
+        if v < 0: return prev_cycle(prev)
+    cycle = [v]
+    u = prev[v]
+    while u != v:
+        cycle.append(u)
+        u = prev[u]
+    cycle.reverse()
+    return cycle
+
+def prev_cycle(prev: "List[int]") -> "List[int]":
+    '''
+    any cycle of the predecessor array, every cycle there is negative
+    once the distances have been relaxed along it
+
+    Params
+    ----------
+        prev List[int]: previous vertex of each vertex, -1 if none
+
+    Returns
+    ----------
+        List[int] : vertices of the cycle in order along the edges,
+            empty if there is none
+    '''
+    n = len(prev)
+    ## 0 not seen, 1 on the current walk, 2 leads to no cycle
+    state = bytearray(n)
+    for s in range(n):
+        if state[s]: continue
+        walk = []
+        v = s
+        while v >= 0 and not state[v]:
+            state[v] = 1
+            walk.append(v)
+            v = prev[v]
+        if v >= 0 and state[v] == 1:
+            cycle = walk[walk.index(v):]
+            cycle.reverse()
+            return cycle
+        for u in walk:
+            state[u] = 2
+    return []
+
+def spfa(
+    n: "int",
+    edges: "List[Tuple[int, int, int]]",
+    src: "Optional[int]"=None
+) -> "Tuple[List[int], List[int], List[int]]":
+    '''
+    shortest path faster algorithm, Bellman Ford driven by a queue of
+    vertices whose distance changed, with the small label first rule:
+    a vertex goes to the front when it is closer than the current front
+
+    Params
+    ----------
+        n int: number of vertices
+        edges List[Tuple[int, int, int]]: (start, end, weight) of each edge
+        src Optional[int]: index of the source vertex,
+            None for a virtual source with a 0 edge to every vertex
+
+    Returns
+    ----------
+        Tuple[List[int], List[int], List[int]] : three lists
+            distance from the source to each vertex, INF if unreachable
+            previous vertex on the shortest path, -1 if none
+            vertices of a negative cycle in order, empty if none
+    '''
+    adjList = [[] for _ in range(n)]
+    for (u, v, w) in edges:
+        adjList[u].append((v, w))
+    dist = [INF] * n
+    prev = [-1] * n
+    ## number of edges on the path to each vertex
+    hops = [0] * n
+    if src is None:
+        dist = [0] * n
+        q = deque(range(n))
+    elif n:
+        dist[src] = 0
+        q = deque([src])
+    else:
+        q = deque()
+    queued = bytearray(n)
+    for u in q:
+        queued[u] = 1
+    while q:
+        u = q.popleft()
+        queued[u] = 0
+        d = dist[u]
+        for (v, w) in adjList[u]:
+            if d + w < dist[v]:
+                dist[v] = d + w
+                prev[v] = u
+                hops[v] = hops[u] + 1
+                ## a path with n edges repeats a vertex
+                if hops[v] >= n:
+                    cycle = prev_cycle(prev)
+                    if cycle: return (dist, prev, cycle)
+                if not queued[v]:
+                    queued[v] = 1
+                    if q and d + w < dist[q[0]]:
+                        q.appendleft(v)
+                    else:
+                        q.append(v)
+    return (dist, prev, [])
+
+def _numpy_cycle(prev: "np.ndarray") -> "List[int]":
+    '''
+    a cycle of the predecessor array by pointer doubling,
+    after at least n steps back only vertices on a cycle remain
+    '''
+    n = len(prev)
+    ## vertex n stands for "no previous vertex" and points to itself
+    step = np.append(np.where(prev < 0, n, prev), n)
+    done = 1
+    while done < n:
+        step = step[step]
+        done *= 2
+    on = np.flatnonzero(step[:n] != n)
+    if not on.size: return []
+    v = int(step[on[0]])
+    cycle = [v]
+    u = int(prev[v])
+    while u != v:
+        cycle.append(u)
+        u = int(prev[u])
+    cycle.reverse()
+    return cycle
+
+def bellman_ford_numpy(
+    n: "int",
+    edges: "Union[List[Tuple[int, int, int]], Tuple[np.ndarray, np.ndarray, np.ndarray]]",
+    src: "Optional[int]"=None
+) -> "Tuple[np.ndarray, np.ndarray, List[int]]":
+    '''
+    Bellman Ford with every pass done as array operations,
+    each pass relaxes all edges against the distances it started with
+    and stops early when nothing improves
+
+    Params
+    ----------
+        n int: number of vertices
+        edges Union[List[Tuple[int, int, int]], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+            (start, end, weight) of each edge, or three arrays of them
+        src Optional[int]: index of the source vertex,
+            None for a virtual source with a 0 edge to every vertex
+
+    Returns
+    ----------
+        Tuple[np.ndarray, np.ndarray, List[int]] :
+            distance from the source to each vertex, INF if unreachable
+            previous vertex on the shortest path, -1 if none
+            vertices of a negative cycle in order, empty if none
+    '''
+    if np is None:
+        raise ImportError("bellman_ford_numpy requires numpy")
+    if isinstance(edges, tuple):
+        (eu, ev, ew) = (np.asarray(a) for a in edges)
+    else:
+        ## integers stay exact, float is only used when the weights need it
+        floating = any(isinstance(w, float) for (_, _, w) in edges)
+        arr = np.asarray(edges, dtype=np.float64 if floating else np.int64).reshape(-1, 3)
+        (eu, ev, ew) = (arr[:, 0].astype(np.int64), arr[:, 1].astype(np.int64), arr[:, 2])
+    dtype = np.float64 if np.issubdtype(ew.dtype, np.floating) else np.int64
+    ew = ew.astype(dtype, copy=False)
+    dist = np.full(n, INF, dtype=dtype)
+    prev = np.full(n, -1, dtype=np.int64)
+    if src is None:
+        dist[:] = 0
+    elif n:
+        dist[src] = 0
+
+    def relax() -> "bool":
+        du = dist[eu]
+        ## INF plus a negative weight must not look reachable
+        cand = np.where(du < INF, du + ew, INF)
+        idx = np.flatnonzero(cand < dist[ev])
+        if not idx.size: return False
+        (tv, tc) = (ev[idx], cand[idx])
+        np.minimum.at(dist, tv, tc)
+        ## any edge that gave the new minimum is a valid previous hop
+        win = idx[tc == dist[tv]]
+        prev[ev[win]] = eu[win]
+        return True
+
+    for _ in range(n - 1):
+        if not relax():
+            return (dist, prev, [])
+    ## still improving, the cycle shows up in prev within n more passes
+    for _ in range(n + 1):
+        if not relax():
+            return (dist, prev, [])
+        cycle = _numpy_cycle(prev)
+        if cycle: return (dist, prev, cycle)
+    return (dist, prev, prev_cycle(prev.tolist()))
+
+def bench_bellman_ford(
+    sizes: "List[Tuple[int, int]]",
+    python_limit: "int"=10**6,
+    seed: "int"=0
+) -> "None":
+    '''
+    time the modes on random sparse graphs with negative edges
+    and no negative cycle, the pure python ones only up to
+    python_limit edges
+
+    Params
+    ----------
+        sizes List[Tuple[int, int]]: (vertices, edges) of each graph
+        python_limit int: largest graph for bellman_ford and spfa
+        seed int: random seed
+    '''
+    rng = np.random.default_rng(seed)
+    for (n, m) in sizes:
+        eu = rng.integers(0, n, m)
+        ev = rng.integers(0, n, m)
+        ## w(u, v) + h(v) - h(u) >= 0 for a potential h, so no negative cycle
+        h = rng.integers(0, 1000, n)
+        ew = rng.integers(0, 100, m) + h[ev] - h[eu]
+        start = time.time()
+        (ref, _, _) = bellman_ford_numpy(n, (eu, ev, ew), 0)
+        print(f"n = {n}, m = {m}, numpy: {time.time() - start:.3f}s")
+        if m > python_limit: continue
+        edges = list(zip(eu.tolist(), ev.tolist(), ew.tolist()))
+        for (name, f) in (("spfa", spfa), ("bellman_ford", bellman_ford)):
+            start = time.time()
+            (dist, _, _) = f(n, edges, 0)
+            print(f"n = {n}, m = {m}, {name}: {time.time() - start:.3f}s")
+            assert dist == ref.tolist()
+
+
+def main():
+    test_case_1 = [
+        (0, 1, 2), (0, 2, -1),
+        (1, 0, 3),
+        (2, 0, 4), (2, 1, 2)
+    ]
+    test_case_2 = [
+        (0, 1, 1), (1, 2, -1), (2, 3, -1), (3, 1, -1)
+    ]
+    print(bellman_ford(3, test_case_1, 0))
+    print(bellman_ford(4, test_case_2, 0))
+    print(bellman_ford(4, test_case_2))
+    print(spfa(3, test_case_1, 0))
+    print(spfa(4, test_case_2))
+    if np is not None:
+        print(bellman_ford_numpy(4, test_case_2, 0))
+        bench_bellman_ford([(10**4, 10**5), (10**5, 10**6), (10**6, 10**7)])
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,167 @@
+# -*- coding: utf-8 -*-
 
+'''
+implementation of breadth first search
+
+BFS visits the vertices in order of their distance (in edges)
+from the start, one level at a time
+
+@author: Gavin Li
+@email: liguangzheng998@hotmail.com
+@created: 10182026
+'''
+
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from ..binarytree.binarytree import ArrayTree, BinaryTree
+from ..graph.graph import CSRGraph, as_csr
 from ..treenode.treenode import TreeNode
-from typing import Optional
 
-def bfs(root: "Optional[TreeNode]"):
-    lst = []
+def bfs(
+    root: "Optional[Union[TreeNode, ArrayTree, BinaryTree]]",
+    levels: "bool"=False,
+    max_depth: "Optional[int]"=None
+) -> "Iterator[Union[TreeNode, int, List[Union[TreeNode, int]]]]":
+    '''
+    level order traversal of a binary tree as a lazy generator,
+    stop early by breaking out of the loop
+
+    Params
+    ----------
+        root Optional[Union[TreeNode, ArrayTree, BinaryTree]]: the tree,
+            a BinaryTree is read through its backing
+        levels bool: yield a list per level instead of single nodes
+        max_depth Optional[int]: do not go below this depth, root is 0
+
+    Returns
+    ----------
+        Iterator[Union[TreeNode, int, List[Union[TreeNode, int]]]]:
+            the nodes, node indices for an ArrayTree
+    '''
+    if isinstance(root, BinaryTree): root = root.root
+    if isinstance(root, ArrayTree):
+        (left, right) = (root.left, root.right)
+        children = lambda i: (left[i], right[i])
+        (start, none) = (root.root, -1)
+    else:
+        children = lambda node: (node.left, node.right)
+        (start, none) = (root, None)
+    if start == none: return
+    q = deque([start])
+    depth = 0
+    while q:
+        expand = max_depth is None or depth < max_depth
+        level = [] if levels else None
+        for _ in range(len(q)):
+            cur = q.popleft()
+            if levels:
+                level.append(cur)
+            else:
+                yield cur
+            if expand:
+                for child in children(cur):
+                    if child != none: q.append(child)
+        if levels: yield level
+        depth += 1
+
+def _graph_levels(
+    graph: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]",
+    sources: "Union[int, Iterable[int]]",
+    max_depth: "Optional[int]",
+    visited: "bytearray"
+) -> "Iterator[List[int]]":
+    '''
+    the frontiers of a multi source BFS, one list per level,
+    visited is updated in place
+    '''
+    if isinstance(sources, int): sources = [sources]
+    frontier = []
+    for s in sources:
+        if not visited[s]:
+            visited[s] = 1
+            frontier.append(s)
+    first = None if isinstance(graph, CSRGraph) else next((row for row in graph if row), None)
+    if first and isinstance(first[0], tuple):
+        ## (neighbor, weight) pairs, the weights are not needed
+        neighbors = lambda u: [v for (v, _) in graph[u]]
+    else:
+        ## adjacency matrix with INF for no edge, or CSR
+        graph = as_csr(graph)
+        (indptr, indices) = (graph.indptr, graph.indices)
+        neighbors = lambda u: indices[indptr[u]:indptr[u + 1]]
+    depth = 0
+    while frontier:
+        yield frontier
+        if max_depth is not None and depth >= max_depth: return
+        nxt = []
+        for u in frontier:
+            for v in neighbors(u):
+                if not visited[v]:
+                    visited[v] = 1
+                    nxt.append(v)
+        frontier = nxt
+        depth += 1
+
+def bfs_graph(
+    graph: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]",
+    sources: "Union[int, Iterable[int]]",
+    levels: "bool"=False,
+    max_depth: "Optional[int]"=None
+) -> "Iterator[Union[Tuple[int, int], List[int]]]":
+    '''
+    BFS over a graph as a lazy generator, one byte per vertex
+    marks it visited, every source starts at depth 0
+
+    Params
+    ----------
+        graph Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]:
+            adjacency matrix with INF for no edge as in mst and fw,
+            adjacency list of (neighbor, weight) as in dijkstra, or CSR
+        sources Union[int, Iterable[int]]: the start vertex or vertices
+        levels bool: yield the list of vertices of each level
+            instead of (vertex, depth)
+        max_depth Optional[int]: do not go further than this depth
+
+    Returns
+    ----------
+        Iterator[Union[Tuple[int, int], List[int]]]: the vertices
+    '''
+    visited = bytearray(len(graph))
+    for (depth, frontier) in enumerate(_graph_levels(graph, sources, max_depth, visited)):
+        if levels:
+            yield frontier
+        else:
+            for v in frontier:
+                yield (v, depth)
+
+def reachable(
+    graph: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]",
+    sources: "Union[int, Iterable[int]]",
+    max_depth: "Optional[int]"=None
+) -> "bytearray":
+    '''
+    which vertices can be reached from the sources
+
+    Returns
+    ----------
+        bytearray: 1 for every reached vertex, 0 otherwise
+    '''
+    visited = bytearray(len(graph))
+    for _ in _graph_levels(graph, sources, max_depth, visited):
+        pass
+    return visited
+
+def main():
+    root = TreeNode.fromList([1, 2, 3, 4, None, 6, 7])
+    print([node.val for node in bfs(root)])
+    print([[node.val for node in level] for level in bfs(root, levels=True, max_depth=1)])
+    tree = ArrayTree.from_list([1, 2, 3, None, 5])
+    print([tree.val[i] for i in bfs(tree)])
+    adjList = [[(1, 1), (2, 1)], [(3, 1)], [(3, 1)], [(4, 1)], [], [(0, 1)]]
+    print(list(bfs_graph(adjList, 0)))
+    csr = CSRGraph.from_edges(6, [(u, v, w) for u in range(6) for (v, w) in adjList[u]])
+    print(list(bfs_graph(csr, [4, 5], levels=True)))
+    print(list(reachable(csr.to_adjmat(), 1)))
+
+if __name__ == "__main__":
+    main()
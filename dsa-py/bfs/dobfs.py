@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+'''
+implementation of direction optimizing breadth first search
+
+on graphs with a small diameter a few middle levels hold most vertices,
+expanding such a frontier top down mostly finds edges into vertices
+that are already visited, so those levels are done bottom up instead:
+every unvisited vertex looks for any parent in the frontier and stops
+at the first one found (Beamer, Asanovic and Patterson, SC 2012)
+
+@author: Gavin Li
+@email: liguangzheng998@hotmail.com
+@created: 10182026
+'''
+
+from typing import Iterable, List, Optional, Tuple, Union
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError: ## direction_optimizing_bfs is unavailable without numpy
+    np = None
+
+from ..graph.graph import INF, CSRGraph, as_csr
+
+## go bottom up once the frontier has more than 1 / ALPHA of the
+## edges left to check, back top down when it has less than
+## 1 / BETA of the vertices and is shrinking
+ALPHA: "int" = 14
+BETA: "int" = 24
+## bottom up checks one more parent per round for every vertex,
+## below this many vertices the rest of their edges are checked at once
+BOTTOM_UP_CUTOFF: "int" = 256
+
+def _gather(
+    indptr: "np.ndarray",
+    vertices: "np.ndarray",
+    skip: "Union[int, np.ndarray]"=0
+) -> "Tuple[np.ndarray, np.ndarray]":
+    '''
+    positions of the edges of the given vertices in a CSR,
+    the first skip edges of each vertex left out
+
+    Returns
+    ----------
+        Tuple[np.ndarray, np.ndarray]: the edge positions
+            and the number of edges of each vertex
+    '''
+    starts = indptr[vertices] + skip
+    counts = indptr[vertices + 1] - starts
+    offsets = np.cumsum(counts) - counts
+    pos = np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+    return (pos, counts)
+
+def direction_optimizing_bfs(
+    graph: "Union[List[List[int]], CSRGraph]",
+    sources: "Union[int, Iterable[int]]",
+    transposed: "Optional[CSRGraph]"=None,
+    mode: "str"="auto"
+) -> "Tuple[np.ndarray, np.ndarray, int]":
+    '''
+    BFS that picks top down or bottom up for each level,
+    the frontier is a numpy bool map of the vertices
+
+    Params
+    ----------
+        graph Union[List[List[int]], CSRGraph]: the graph in CSR form
+            or as an adjacency matrix
+        sources Union[int, Iterable[int]]: the start vertex or vertices
+        transposed Optional[CSRGraph]: the graph with every edge reversed,
+            pass graph itself when it is undirected,
+            built with graph.transpose() when omitted
+        mode str: "auto" to switch by frontier size,
+            "top-down" or "bottom-up" to force one direction
+
+    Returns
+    ----------
+        Tuple[np.ndarray, np.ndarray, int]:
+            number of edges from the nearest source, -1 if unreachable
+            parent on a shortest path, -1 for sources and unreachable
+            number of edges examined
+    '''
+    if np is None:
+        raise ImportError("direction_optimizing_bfs requires numpy")
+    if mode not in ("auto", "top-down", "bottom-up"):
+        raise ValueError(f"unknown mode {mode}")
+    graph = as_csr(graph)
+    n = len(graph)
+    (indptr, indices, _) = graph.to_numpy()
+    if transposed is None:
+        transposed = graph.transpose()
+    (tindptr, tindices, _) = transposed.to_numpy()
+    (outdeg, indeg) = (np.diff(indptr), np.diff(tindptr))
+
+    dist = np.full(n, -1, dtype=np.int64)
+    parent = np.full(n, -1, dtype=np.int64)
+    visited = np.zeros(n, dtype=np.bool_)
+    frontier = np.zeros(n, dtype=np.bool_)
+    if isinstance(sources, int): sources = [sources]
+    src = np.unique(np.asarray(list(sources), dtype=np.int64))
+    (dist[src], visited[src], frontier[src]) = (0, True, True)
+    ## edges into unvisited vertices, what bottom up could have to check
+    m_u = int(indeg.sum() - indeg[src].sum())
+    (n_f, prev_n_f) = (len(src), 0)
+    examined = 0
+    bottom_up = mode == "bottom-up"
+    depth = 0
+    while n_f:
+        if mode == "auto":
+            m_f = int(outdeg[frontier].sum())
+            if not bottom_up and m_f > m_u / ALPHA:
+                bottom_up = True
+            elif bottom_up and n_f < n / BETA and n_f < prev_n_f:
+                bottom_up = False
+        nxt = np.zeros(n, dtype=np.bool_)
+        if bottom_up:
+            ## each unvisited vertex checks its parents one per round
+            ## until it finds one in the frontier
+            active = np.flatnonzero(~visited & (indeg > 0))
+            k = 0
+            while active.size > BOTTOM_UP_CUTOFF:
+                cand = tindices[tindptr[active] + k]
+                examined += active.size
+                hit = frontier[cand]
+                (nxt[active[hit]], parent[active[hit]]) = (True, cand[hit])
+                k += 1
+                active = active[~hit & (indeg[active] > k)]
+            if active.size:
+                (pos, counts) = _gather(tindptr, active, k)
+                examined += pos.size
+                cand = tindices[pos]
+                hit = np.flatnonzero(frontier[cand])
+                owner = np.repeat(active, counts)[hit]
+                ## any parent will do, keep the first of each vertex
+                (owner, first) = np.unique(owner, return_index=True)
+                (nxt[owner], parent[owner]) = (True, cand[hit[first]])
+        else:
+            front = np.flatnonzero(frontier)
+            (pos, counts) = _gather(indptr, front)
+            examined += pos.size
+            child = indices[pos]
+            new = ~visited[child]
+            (child, par) = (child[new], np.repeat(front, counts)[new])
+            (nxt[child], parent[child]) = (True, par)
+        depth += 1
+        dist[nxt] = depth
+        visited |= nxt
+        (frontier, prev_n_f) = (nxt, n_f)
+        n_f = int(np.count_nonzero(nxt))
+        m_u -= int(indeg[nxt].sum())
+    return (dist, parent, examined)
+
+def bench_dobfs(
+    sizes: "List[int]",
+    degree: "int"=16,
+    seed: "int"=0
+) -> "None":
+    '''
+    time the three modes on random undirected graphs
+    '''
+    rng = random.Random(seed)
+    for n in sizes:
+        edges = []
+        for _ in range(n * degree // 2):
+            (u, v) = (rng.randrange(n), rng.randrange(n))
+            edges.append((u, v, 1))
+        graph = CSRGraph.from_edges(n, edges, directed=False)
+        ref = None
+        for mode in ("top-down", "bottom-up", "auto"):
+            start = time.time()
+            (dist, _, examined) = direction_optimizing_bfs(graph, 0, graph, mode)
+            elapsed = time.time() - start
+            if ref is None: ref = dist
+            assert (dist == ref).all()
+            print(f"n = {n}, {mode}: {elapsed:.3f}s, {examined} edges examined")
+
+def main():
+    adjMat = [
+        [0, 1, 1, INF, INF],
+        [INF, 0, INF, 1, INF],
+        [INF, INF, 0, 1, INF],
+        [INF, INF, INF, 0, 1],
+        [INF, INF, INF, INF, 0],
+    ]
+    if np is not None:
+        print(direction_optimizing_bfs(adjMat, 0))
+        bench_dobfs([10**5, 10**6])
+
+if __name__ == "__main__":
+    main()
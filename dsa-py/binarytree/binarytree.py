@@ -1,15 +1,262 @@
 # import sys
 # import os
 # sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from ..treenode.treenode import TreeNode
+from array import array
+from collections import deque
+from typing import List, Optional, Union
+import struct
+import sys
+from ..treenode.treenode import TreeNode, parse_level_order
+
+TREE_MAGIC: "bytes" = b"BTRE"
+## magic, version, value typecode, number of nodes, root
+TREE_HEADER: "str" = "<4sHcxQq"
+
+class ArrayTree():
+    '''
+    binary tree in three parallel arrays, node i has value val[i]
+    and children left[i] / right[i], -1 for no child
+    about 16 bytes per node instead of a TreeNode object and its value
+    '''
+    def __init__(self, typecode: "str"="q") -> "None":
+        self.val = array(typecode)
+        self.left = array("i")
+        self.right = array("i")
+        self.root = -1
+
+    def __len__(self) -> "int":
+        return len(self.val)
+
+    def __str__(self) -> "str":
+        return str(self.to_list())
+
+    def __repr__(self) -> "str":
+        return self.__str__()
+
+    def add(self, val: "Union[int, float]", left: "int"=-1, right: "int"=-1) -> "int":
+        '''
+        append a node
+
+        Returns
+        ----------
+            int: index of the new node
+        '''
+        self.val.append(val)
+        self.left.append(left)
+        self.right.append(right)
+        return len(self.val) - 1
+
+    def to_list(self) -> "List[Optional[Union[int, float]]]":
+        '''
+        level order with None only for the missing children of nodes,
+        trailing None dropped, O(n) whatever the shape of the tree
+
+        Returns
+        ----------
+            List[Optional[Union[int, float]]]: the tree as a list
+        '''
+        ans = []
+        if self.root < 0: return ans
+        (val, left, right) = (self.val, self.left, self.right)
+        q = deque([self.root])
+        while q:
+            cur = q.popleft()
+            if cur < 0:
+                ans.append(None)
+                continue
+            ans.append(val[cur])
+            q.append(left[cur])
+            q.append(right[cur])
+        while ans[-1] is None:
+            ans.pop()
+        return ans
+
+    @classmethod
+    def from_list(cls, lst: "List[Optional[Union[int, float]]]") -> "ArrayTree":
+        '''
+        build from the level order list of to_list in one pass,
+        nodes are numbered in the order they appear in the list
+
+        Params
+        ----------
+            lst List[Optional[Union[int, float]]]: the tree as a list
+
+        Returns
+        ----------
+            ArrayTree: the tree
+        '''
+        (vals, left, right) = parse_level_order(lst)
+        code = "d" if any(isinstance(v, float) for v in vals) else "q"
+        tree = cls(code)
+        tree.val.extend(vals)
+        (tree.left, tree.right) = (left, right)
+        tree.root = 0 if vals else -1
+        return tree
+
+    @classmethod
+    def from_nodes(cls, root: "Optional[TreeNode]") -> "ArrayTree":
+        '''
+        copy a linked tree, iterative so deep trees are fine
+
+        Returns
+        ----------
+            ArrayTree: the tree, nodes numbered in level order
+        '''
+        vals = []
+        q = deque([root] if root else [])
+        while q:
+            cur = q.popleft()
+            vals.append(cur.val)
+            if cur.left: q.append(cur.left)
+            if cur.right: q.append(cur.right)
+        code = "d" if any(isinstance(v, float) for v in vals) else "q"
+        tree = cls(code)
+        if not root: return tree
+        tree.val.extend(vals)
+        tree.left.extend([-1] * len(vals))
+        tree.right.extend([-1] * len(vals))
+        tree.root = 0
+        ## same level order again, children get the next free indices
+        nxt = 1
+        q.append(root)
+        idx = 0
+        while q:
+            cur = q.popleft()
+            if cur.left:
+                tree.left[idx] = nxt
+                nxt += 1
+                q.append(cur.left)
+            if cur.right:
+                tree.right[idx] = nxt
+                nxt += 1
+                q.append(cur.right)
+            idx += 1
+        return tree
+
+    def to_nodes(self) -> "Optional[TreeNode]":
+        '''
+        copy to a linked tree
+
+        Returns
+        ----------
+            Optional[TreeNode]: the root
+        '''
+        nodes = [TreeNode(v) for v in self.val]
+        for (i, node) in enumerate(nodes):
+            if self.left[i] >= 0: node.left = nodes[self.left[i]]
+            if self.right[i] >= 0: node.right = nodes[self.right[i]]
+        return nodes[self.root] if self.root >= 0 else None
+
+    def to_bytes(self) -> "bytes":
+        '''
+        header then the val, left and right arrays as little endian
+
+        Returns
+        ----------
+            bytes: the serialized tree
+        '''
+        code = self.val.typecode.encode()
+        header = struct.pack(TREE_HEADER, TREE_MAGIC, 1, code, len(self), self.root)
+        parts = [header]
+        for arr in (self.val, self.left, self.right):
+            if sys.byteorder == "big":
+                arr = array(arr.typecode, arr)
+                arr.byteswap()
+            parts.append(arr.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: "bytes") -> "ArrayTree":
+        '''
+        read what to_bytes wrote
+
+        Params
+        ----------
+            data bytes: the serialized tree
+
+        Returns
+        ----------
+            ArrayTree: the tree
+        '''
+        size = struct.calcsize(TREE_HEADER)
+        (magic, version, code, n, root) = struct.unpack(TREE_HEADER, data[:size])
+        if magic != TREE_MAGIC or version != 1:
+            raise ValueError("not a tree written by ArrayTree.to_bytes")
+        tree = cls(code.decode())
+        off = size
+        for arr in (tree.val, tree.left, tree.right):
+            end = off + n * arr.itemsize
+            if end > len(data):
+                raise ValueError("truncated tree data")
+            arr.frombytes(data[off:end])
+            if sys.byteorder == "big":
+                arr.byteswap()
+            off = end
+        if root >= n or (root < 0) != (n == 0):
+            raise ValueError(f"root {root} out of range for {n} nodes")
+        tree.root = root
+        return tree
+
+    def save(self, path: "str") -> "None":
+        '''
+        write to_bytes to a file
+        '''
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: "str") -> "ArrayTree":
+        '''
+        read a file written by save
+        '''
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
 
 class BinaryTree:
-    def __init__(self, root: "TreeNode"=None):
+    def __init__(self, root: "Optional[Union[TreeNode, ArrayTree]]"=None):
+        ## either backing, linked TreeNode or compact ArrayTree
         self.root = root
-    
+
     def __str__(self):
         return str(self.root)
 
+    @classmethod
+    def fromList(
+        cls,
+        lst: "List[Optional[Union[int, float]]]",
+        compact: "bool"=False
+    ) -> "BinaryTree":
+        '''
+        build from the level order list that str prints,
+        read the same way whichever backing compact picks
+
+        Returns
+        ----------
+            BinaryTree: the tree
+        '''
+        if compact:
+            return cls(ArrayTree.from_list(lst))
+        return cls(TreeNode.fromList(lst))
+
+    def isCompact(self) -> "bool":
+        return isinstance(self.root, ArrayTree)
+
+    def toCompact(self) -> "BinaryTree":
+        '''
+        same tree backed by an ArrayTree
+        '''
+        if self.isCompact(): return self
+        return BinaryTree(ArrayTree.from_nodes(self.root))
+
+    def toNodes(self) -> "BinaryTree":
+        '''
+        same tree backed by TreeNode objects
+        '''
+        if not self.isCompact(): return self
+        return BinaryTree(self.root.to_nodes())
+
 if __name__ == "__main__":
     a = BinaryTree()
-    print("succesful")
\ No newline at end of file
+    print("succesful")
+    b = BinaryTree.fromList([1, 2, 3, None, 5], compact=True)
+    print(b, b.toNodes(), ArrayTree.from_bytes(b.root.to_bytes()))
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+
+'''
+implementation of depth first search and the algorithms built on it
+
+every search keeps its own stack and an edge cursor per vertex
+instead of recursing, so the depth of the graph is not limited by
+the recursion limit and the extra memory is a few arrays of n numbers
+
+@author: Gavin Li
+@email: liguangzheng998@hotmail.com
+@created: 10182026
+'''
+
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from ..graph.graph import INF, CSRGraph, as_csr
+
+PRE: "str" = "pre"
+POST: "str" = "post"
+
+def dfs_events(
+    graph: "Union[List[List[int]], CSRGraph]",
+    sources: "Optional[Iterable[int]]"=None
+) -> "Iterator[Tuple[str, int, int]]":
+    '''
+    depth first search as a stream of events,
+    (PRE, v, parent) when v is first reached and
+    (POST, v, parent) when all its edges are done
+
+    Params
+    ----------
+        graph Union[List[List[int]], CSRGraph]: adjacency matrix
+            with INF for no edge, or the graph in CSR form
+        sources Optional[Iterable[int]]: where to start,
+            every vertex in order when omitted so the whole graph is seen
+
+    Returns
+    ----------
+        Iterator[Tuple[str, int, int]]: the events,
+            parent is -1 for the start of each tree
+    '''
+    graph = as_csr(graph)
+    n = len(graph)
+    (indptr, indices) = (graph.indptr, graph.indices)
+    ## next edge to look at for each vertex
+    cursor = array("q", indptr)
+    parent = array("i", [-1]) * n
+    seen = bytearray(n)
+    for s in (range(n) if sources is None else sources):
+        if seen[s]: continue
+        seen[s] = 1
+        yield (PRE, s, -1)
+        stack = [s]
+        while stack:
+            u = stack[-1]
+            i = cursor[u]
+            if i < indptr[u + 1]:
+                cursor[u] = i + 1
+                v = indices[i]
+                if not seen[v]:
+                    seen[v] = 1
+                    parent[v] = u
+                    yield (PRE, v, u)
+                    stack.append(v)
+            else:
+                stack.pop()
+                yield (POST, u, parent[u])
+
+def postorder(
+    graph: "Union[List[List[int]], CSRGraph]",
+    sources: "Optional[Iterable[int]]"=None
+) -> "List[int]":
+    '''
+    vertices in the order their search finishes
+
+    Returns
+    ----------
+        List[int]: the post order
+    '''
+    return [v for (kind, v, _) in dfs_events(graph, sources) if kind == POST]
+
+def topological_sort(
+    graph: "Union[List[List[int]], CSRGraph]"
+) -> "Tuple[Optional[List[int]], Optional[List[int]]]":
+    '''
+    order the vertices so every edge goes forward,
+    reverse post order of a DFS, a back edge means a cycle
+
+    Params
+    ----------
+        graph Union[List[List[int]], CSRGraph]: adjacency matrix
+            with INF for no edge, or the graph in CSR form
+
+    Returns
+    ----------
+        Tuple[Optional[List[int]], Optional[List[int]]]: two lists
+            the topological order, None if the graph has a cycle
+            the vertices of a cycle in edge order, None if there is none
+    '''
+    graph = as_csr(graph)
+    n = len(graph)
+    (indptr, indices) = (graph.indptr, graph.indices)
+    cursor = array("q", indptr)
+    parent = array("i", [-1]) * n
+    ## 0 not seen, 1 on the stack, 2 done
+    state = bytearray(n)
+    order = []
+    for s in range(n):
+        if state[s]: continue
+        state[s] = 1
+        stack = [s]
+        while stack:
+            u = stack[-1]
+            i = cursor[u]
+            if i < indptr[u + 1]:
+                cursor[u] = i + 1
+                v = indices[i]
+                if state[v] == 0:
+                    state[v] = 1
+                    parent[v] = u
+                    stack.append(v)
+                elif state[v] == 1:
+                    ## back edge u -> v, the stack holds the way from v to u
+                    cycle = [u]
+                    while cycle[-1] != v:
+                        cycle.append(parent[cycle[-1]])
+                    cycle.reverse()
+                    return (None, cycle)
+            else:
+                stack.pop()
+                state[u] = 2
+                order.append(u)
+    order.reverse()
+    return (order, None)
+
+def tarjan_scc(
+    graph: "Union[List[List[int]], CSRGraph]"
+) -> "Tuple[List[int], int]":
+    '''
+    strongly connected components with Tarjan algorithm,
+    one DFS keeping the lowest index reachable from each vertex
+
+    Params
+    ----------
+        graph Union[List[List[int]], CSRGraph]: adjacency matrix
+            with INF for no edge, or the graph in CSR form
+
+    Returns
+    ----------
+        Tuple[List[int], int]: component of each vertex and the number
+            of components, numbered in reverse topological order
+    '''
+    graph = as_csr(graph)
+    n = len(graph)
+    (indptr, indices) = (graph.indptr, graph.indices)
+    cursor = array("q", indptr)
+    index = array("q", [-1]) * n
+    low = array("q", [0]) * n
+    comp = array("i", [-1]) * n
+    ## vertices whose component is not decided yet
+    pending = []
+    count = 0
+    t = 0
+    for s in range(n):
+        if index[s] >= 0: continue
+        index[s] = low[s] = t
+        t += 1
+        pending.append(s)
+        stack = [s]
+        while stack:
+            u = stack[-1]
+            i = cursor[u]
+            if i < indptr[u + 1]:
+                cursor[u] = i + 1
+                v = indices[i]
+                if index[v] < 0:
+                    index[v] = low[v] = t
+                    t += 1
+                    pending.append(v)
+                    stack.append(v)
+                elif comp[v] < 0 and index[v] < low[u]:
+                    low[u] = index[v]
+            else:
+                stack.pop()
+                if stack and low[u] < low[stack[-1]]:
+                    low[stack[-1]] = low[u]
+                if low[u] == index[u]:
+                    ## u is the root of a component, pop it off
+                    while True:
+                        v = pending.pop()
+                        comp[v] = count
+                        if v == u: break
+                    count += 1
+    return (comp.tolist(), count)
+
+def kosaraju_scc(
+    graph: "Union[List[List[int]], CSRGraph]"
+) -> "Tuple[List[int], int]":
+    '''
+    strongly connected components with Kosaraju algorithm,
+    a DFS for the finish order then one on the reversed graph
+
+    Params
+    ----------
+        graph Union[List[List[int]], CSRGraph]: adjacency matrix
+            with INF for no edge, or the graph in CSR form
+
+    Returns
+    ----------
+        Tuple[List[int], int]: component of each vertex and the number
+            of components, numbered in topological order
+    '''
+    graph = as_csr(graph)
+    n = len(graph)
+    order = postorder(graph)
+    rev = graph.transpose()
+    (indptr, indices) = (rev.indptr, rev.indices)
+    comp = array("i", [-1]) * n
+    count = 0
+    for s in reversed(order):
+        if comp[s] >= 0: continue
+        comp[s] = count
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            for i in range(indptr[u], indptr[u + 1]):
+                v = indices[i]
+                if comp[v] < 0:
+                    comp[v] = count
+                    stack.append(v)
+        count += 1
+    return (comp.tolist(), count)
+
+def bridges_and_articulation_points(
+    graph: "Union[List[List[int]], CSRGraph]"
+) -> "Tuple[List[Tuple[int, int]], List[int]]":
+    '''
+    edges and vertices whose removal disconnects an undirected graph,
+    found with the lowest discovery time reachable from each subtree
+
+    Params
+    ----------
+        graph Union[List[List[int]], CSRGraph]: undirected graph
+            with every edge stored both ways, as an adjacency matrix
+            with INF for no edge or in CSR form
+
+    Returns
+    ----------
+        Tuple[List[Tuple[int, int]], List[int]]: two lists
+            the bridges as (parent, child) of the DFS tree
+            the articulation points in increasing order
+    '''
+    graph = as_csr(graph)
+    n = len(graph)
+    (indptr, indices) = (graph.indptr, graph.indices)
+    cursor = array("q", indptr)
+    disc = array("q", [-1]) * n
+    low = array("q", [0]) * n
+    parent = array("i", [-1]) * n
+    ## the edge back to the parent is skipped once, a parallel edge is not
+    skipped = bytearray(n)
+    cut = bytearray(n)
+    bridges = []
+    t = 0
+    for root in range(n):
+        if disc[root] >= 0: continue
+        disc[root] = low[root] = t
+        t += 1
+        children = 0
+        stack = [root]
+        while stack:
+            u = stack[-1]
+            i = cursor[u]
+            if i < indptr[u + 1]:
+                cursor[u] = i + 1
+                v = indices[i]
+                if v == parent[u] and not skipped[u]:
+                    skipped[u] = 1
+                elif disc[v] < 0:
+                    parent[v] = u
+                    disc[v] = low[v] = t
+                    t += 1
+                    stack.append(v)
+                elif disc[v] < low[u]:
+                    low[u] = disc[v]
+            else:
+                stack.pop()
+                p = parent[u]
+                if p < 0: continue
+                if low[u] < low[p]:
+                    low[p] = low[u]
+                if low[u] > disc[p]:
+                    bridges.append((p, u))
+                if p == root:
+                    children += 1
+                elif low[u] >= disc[p]:
+                    cut[p] = 1
+        if children > 1:
+            cut[root] = 1
+    return (bridges, [v for v in range(n) if cut[v]])
+
+def main():
+    adjMat = [
+        [0, 1, INF, INF, INF, INF],
+        [INF, 0, 1, INF, INF, INF],
+        [1, INF, 0, 1, INF, INF],
+        [INF, INF, INF, 0, 1, INF],
+        [INF, INF, INF, 1, 0, 1],
+        [INF, INF, INF, INF, INF, 0],
+    ]
+    print(list(dfs_events(adjMat, [0])))
+    print(tarjan_scc(adjMat))
+    print(kosaraju_scc(adjMat))
+    print(topological_sort(adjMat))
+    dag = CSRGraph.from_edges(5, [(0, 1, 1), (0, 2, 1), (1, 3, 1), (2, 3, 1), (3, 4, 1)])
+    print(topological_sort(dag))
+    ## two triangles joined by the edge 2 - 3
+    undirected = CSRGraph.from_edges(
+        6,
+        [(0, 1, 1), (1, 2, 1), (2, 0, 1), (2, 3, 1), (3, 4, 1), (4, 5, 1), (5, 3, 1)],
+        directed=False
+    )
+    print(bridges_and_articulation_points(undirected))
+    ## a path far deeper than the recursion limit
+    n = 10**6
+    path = CSRGraph.from_edges(n, [(i, i + 1, 1) for i in range(n - 1)])
+    print(len(topological_sort(path)[0]), tarjan_scc(path)[1])
+
+if __name__ == "__main__":
+    main()
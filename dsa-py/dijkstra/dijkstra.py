@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+
+'''
+implementation of Dijkstra algorithm
+
+Dijkstra algorithm finds the shortest path from one vertex
+to every other vertex when no edge weight is negative
+
+point to point queries stop as soon as the target is settled,
+search from both ends, or are steered towards the target with A*,
+a DijkstraContext keeps its arrays between queries and only resets
+the vertices the last query touched
+
+@author: Gavin Li
+@email: liguangzheng998@hotmail.com
+@created: 10182026
+'''
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+import heapq
+import math
+import random
+import time
+from ..graph.graph import CSRGraph
+
+INF: "int" = 10**18
+
+def _as_graph(
+    graph: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]"
+) -> "Union[List[List[Tuple[int, int]]], CSRGraph]":
+    '''
+    adjacency list or CSR as they are, an adjacency matrix
+    (rows of weights, INF for no edge) converted to CSR
+    '''
+    if isinstance(graph, CSRGraph): return graph
+    if graph and graph[0] and not isinstance(graph[0][0], tuple):
+        return CSRGraph.from_adjmat(graph)
+    return graph
+
+def dijkstra(
+    adjList: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]",
+    src: "int",
+    target: "Optional[int]"=None
+) -> "Tuple[List[int], List[int]]":
+    '''
+    Dijkstra algorithm with a binary heap,
+    stale heap entries are skipped instead of removed
+
+    Params
+    ----------
+        adjList Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]:
+            (neighbor, weight) of every edge going out of each vertex,
+            an adjacency matrix with INF for no edge or a CSRGraph
+        src int: index of the source vertex
+        target Optional[int]: stop once this vertex is settled,
+            the distances of vertices not settled yet are upper bounds
+
+    Returns
+    ----------
+        Tuple[List[int], List[int]] : two lists
+            distance from the source to each vertex, INF if unreachable
+            previous vertex on the shortest path, -1 if none
+    '''
+    adjList = _as_graph(adjList)
+    n = len(adjList)
+    dist = [INF] * n
+    prev = [-1] * n
+    dist[src] = 0
+    pq = [(0, src)]
+    while pq:
+        (d, u) = heapq.heappop(pq)
+        ## a shorter path to u was found after this entry was pushed
+        if d > dist[u]: continue
+        if u == target: break
+        for (v, w) in adjList[u]:
+            if d + w < dist[v]:
+                dist[v] = d + w
+                prev[v] = u
+                heapq.heappush(pq, (dist[v], v))
+    return (dist, prev)
+
+def _reverse(
+    graph: "Union[List[List[Tuple[int, int]]], CSRGraph]"
+) -> "Union[List[List[Tuple[int, int]]], CSRGraph]":
+    '''
+    the graph with every edge reversed, in the same form
+    '''
+    if isinstance(graph, CSRGraph): return graph.transpose()
+    rev = [[] for _ in range(len(graph))]
+    for (u, row) in enumerate(graph):
+        for (v, w) in row:
+            rev[v].append((u, w))
+    return rev
+
+class DijkstraContext():
+    '''
+    shortest path queries on one graph,
+    the distance and previous vertex arrays are allocated once
+    and a query only resets the vertices the previous one touched,
+    so a query costs the part of the graph it explores, not O(n)
+    '''
+    def __init__(
+        self,
+        graph: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]",
+        reverse: "Optional[Union[List[List[Tuple[int, int]]], CSRGraph]]"=None
+    ) -> "None":
+        self.graph = _as_graph(graph)
+        self.n = len(self.graph)
+        ## reversed graph for the backward half of bidirectional search,
+        ## built the first time it is needed unless given
+        self.reverse = reverse
+        self.dist = [INF] * self.n
+        self.prev = [-1] * self.n
+        self.touched = []
+        self.dist_b = None
+        self.prev_b = None
+        self.touched_b = []
+        ## vertex where the two halves of the last bidirectional search met
+        self.meet = -1
+
+    def _neighbors(
+        self,
+        graph: "Union[List[List[Tuple[int, int]]], CSRGraph]"
+    ) -> "Callable[[int], Iterable[Tuple[int, int]]]":
+        if isinstance(graph, CSRGraph): return graph.neighbors
+        return graph.__getitem__
+
+    def _reset(self) -> "None":
+        for v in self.touched:
+            self.dist[v] = INF
+            self.prev[v] = -1
+        self.touched.clear()
+        for v in self.touched_b:
+            self.dist_b[v] = INF
+            self.prev_b[v] = -1
+        self.touched_b.clear()
+        self.meet = -1
+
+    def search(
+        self,
+        src: "int",
+        targets: "Optional[Iterable[int]]"=None
+    ) -> "None":
+        '''
+        Dijkstra from src, stopping once every target is settled,
+        read the results from dist and prev or with path
+
+        Params
+        ----------
+            src int: index of the source vertex
+            targets Optional[Iterable[int]]: vertices to settle,
+                the whole reachable graph when omitted
+        '''
+        self._reset()
+        (dist, prev, touched) = (self.dist, self.prev, self.touched)
+        neighbors = self._neighbors(self.graph)
+        left = None if targets is None else set(targets)
+        dist[src] = 0
+        touched.append(src)
+        pq = [(0, src)]
+        while pq:
+            (d, u) = heapq.heappop(pq)
+            if d > dist[u]: continue
+            if left is not None:
+                left.discard(u)
+                if not left: break
+            for (v, w) in neighbors(u):
+                if d + w < dist[v]:
+                    if dist[v] == INF: touched.append(v)
+                    dist[v] = d + w
+                    prev[v] = u
+                    heapq.heappush(pq, (d + w, v))
+
+    def query(self, src: "int", target: "int") -> "int":
+        '''
+        distance from src to target with early exit
+
+        Returns
+        ----------
+            int: the distance, INF if target cannot be reached
+        '''
+        self.search(src, (target,))
+        return self.dist[target]
+
+    def astar(
+        self,
+        src: "int",
+        target: "int",
+        heuristic: "Callable[[int, int], int]"
+    ) -> "int":
+        '''
+        A* search, Dijkstra ordered by distance plus an estimate
+        of what is left so fewer vertices are settled
+
+        Params
+        ----------
+            src int: index of the source vertex
+            target int: index of the target vertex
+            heuristic Callable[[int, int], int]: heuristic(v, target)
+                is a lower bound of the distance from v to target,
+                it must be consistent (never drop by more than an edge
+                weight along an edge) for the answer to be exact
+
+        Returns
+        ----------
+            int: the distance, INF if target cannot be reached
+        '''
+        self._reset()
+        (dist, prev, touched) = (self.dist, self.prev, self.touched)
+        neighbors = self._neighbors(self.graph)
+        dist[src] = 0
+        touched.append(src)
+        pq = [(heuristic(src, target), 0, src)]
+        while pq:
+            (_, d, u) = heapq.heappop(pq)
+            if d > dist[u]: continue
+            if u == target: break
+            for (v, w) in neighbors(u):
+                if d + w < dist[v]:
+                    if dist[v] == INF: touched.append(v)
+                    dist[v] = d + w
+                    prev[v] = u
+                    heapq.heappush(pq, (d + w + heuristic(v, target), d + w, v))
+        return dist[target]
+
+    def bidirectional(self, src: "int", target: "int") -> "int":
+        '''
+        Dijkstra from src and from target on the reversed graph
+        at the same time, growing the smaller frontier, until the
+        two smallest keys add up to the best path found so far
+
+        Returns
+        ----------
+            int: the distance, INF if target cannot be reached
+        '''
+        if self.reverse is None:
+            self.reverse = _reverse(self.graph)
+        if self.dist_b is None:
+            self.dist_b = [INF] * self.n
+            self.prev_b = [-1] * self.n
+        self._reset()
+        sides = (
+            (self.dist, self.prev, self.touched, self._neighbors(self.graph), self.dist_b),
+            (self.dist_b, self.prev_b, self.touched_b, self._neighbors(self.reverse), self.dist)
+        )
+        self.dist[src] = 0
+        self.touched.append(src)
+        self.dist_b[target] = 0
+        self.touched_b.append(target)
+        pqs = ([(0, src)], [(0, target)])
+        (best, meet) = (INF if src != target else 0, src)
+        while pqs[0] and pqs[1] and pqs[0][0][0] + pqs[1][0][0] < best:
+            side = 0 if len(pqs[0]) <= len(pqs[1]) else 1
+            pq = pqs[side]
+            (dist, prev, touched, neighbors, other) = sides[side]
+            (d, u) = heapq.heappop(pq)
+            if d > dist[u]: continue
+            for (v, w) in neighbors(u):
+                nd = d + w
+                if nd < dist[v]:
+                    if dist[v] == INF: touched.append(v)
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(pq, (nd, v))
+                if nd + other[v] < best:
+                    (best, meet) = (nd + other[v], v)
+        self.meet = meet if best < INF else -1
+        return best
+
+    def path(self, target: "int") -> "List[int]":
+        '''
+        the shortest path found by the last query ending at target,
+        for a bidirectional query the target has to be its target
+
+        Returns
+        ----------
+            List[int]: the vertices from the source, empty if none
+        '''
+        if self.meet >= 0:
+            ans = [self.meet]
+            while self.prev[ans[-1]] >= 0:
+                ans.append(self.prev[ans[-1]])
+            ans.reverse()
+            while self.prev_b[ans[-1]] >= 0:
+                ans.append(self.prev_b[ans[-1]])
+            return ans
+        if self.dist[target] == INF: return []
+        ans = [target]
+        while self.prev[ans[-1]] >= 0:
+            ans.append(self.prev[ans[-1]])
+        ans.reverse()
+        return ans
+
+    def batch(
+        self,
+        pairs: "Iterable[Tuple[int, int]]",
+        mode: "str"="dijkstra",
+        heuristic: "Optional[Callable[[int, int], int]]"=None
+    ) -> "List[int]":
+        '''
+        answer many queries with the same arrays, in dijkstra mode
+        queries sharing a source are answered by one search
+
+        Params
+        ----------
+            pairs Iterable[Tuple[int, int]]: (source, target) queries
+            mode str: "dijkstra", "bidirectional" or "astar"
+            heuristic Optional[Callable[[int, int], int]]: for astar
+
+        Returns
+        ----------
+            List[int]: the distance of each query, INF if unreachable
+        '''
+        pairs = list(pairs)
+        if mode == "bidirectional":
+            return [self.bidirectional(s, t) for (s, t) in pairs]
+        if mode == "astar":
+            if heuristic is None:
+                raise ValueError("astar needs a heuristic")
+            return [self.astar(s, t, heuristic) for (s, t) in pairs]
+        if mode != "dijkstra":
+            raise ValueError(f"unknown mode {mode}")
+        groups: "Dict[int, List[int]]" = {}
+        for (i, (s, _)) in enumerate(pairs):
+            groups.setdefault(s, []).append(i)
+        ans = [INF] * len(pairs)
+        for (s, idx) in groups.items():
+            self.search(s, [pairs[i][1] for i in idx])
+            for i in idx:
+                ans[i] = self.dist[pairs[i][1]]
+        return ans
+
+def bidirectional_dijkstra(
+    graph: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]",
+    src: "int",
+    target: "int"
+) -> "Tuple[int, List[int]]":
+    '''
+    one bidirectional query, use a DijkstraContext for many
+
+    Returns
+    ----------
+        Tuple[int, List[int]]: the distance (INF if unreachable)
+            and the vertices of the path
+    '''
+    ctx = DijkstraContext(graph)
+    d = ctx.bidirectional(src, target)
+    return (d, ctx.path(target))
+
+def astar(
+    graph: "Union[List[List[int]], List[List[Tuple[int, int]]], CSRGraph]",
+    src: "int",
+    target: "int",
+    heuristic: "Callable[[int, int], int]"
+) -> "Tuple[int, List[int]]":
+    '''
+    one A* query, use a DijkstraContext for many
+
+    Returns
+    ----------
+        Tuple[int, List[int]]: the distance (INF if unreachable)
+            and the vertices of the path
+    '''
+    ctx = DijkstraContext(graph)
+    d = ctx.astar(src, target, heuristic)
+    return (d, ctx.path(target))
+
+def euclidean(coords: "List[Tuple[float, float]]") -> "Callable[[int, int], float]":
+    '''
+    straight line distance heuristic for vertices with coordinates,
+    consistent when no edge is shorter than the line between its ends
+    '''
+    return lambda v, t: math.dist(coords[v], coords[t])
+
+def bench_queries(
+    side: "int"=1000,
+    queries: "int"=200,
+    seed: "int"=0
+) -> "None":
+    '''
+    time the query modes on a side x side grid with random weights
+    '''
+    rng = random.Random(seed)
+    n = side * side
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            u = r * side + c
+            if c + 1 < side: edges.append((u, u + 1, rng.randint(10, 20)))
+            if r + 1 < side: edges.append((u, u + side, rng.randint(10, 20)))
+    graph = CSRGraph.from_edges(n, edges, directed=False)
+    ## grid distance times the smallest weight never overestimates
+    heuristic = lambda v, t: 10 * (abs(v // side - t // side) + abs(v % side - t % side))
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(queries)]
+    ctx = DijkstraContext(graph)
+    ctx.bidirectional(0, 0)
+    ref = None
+    for mode in ("dijkstra", "bidirectional", "astar"):
+        start = time.time()
+        ans = ctx.batch(pairs, mode, heuristic)
+        elapsed = time.time() - start
+        if ref is None: ref = ans
+        assert ans == ref
+        print(f"n = {n}, {mode}: {queries / elapsed:.1f} queries/s")
+
+
+def main():
+    test_case_1 = [
+        [(1, 3), (3, 7)],
+        [(0, 8), (2, 2)],
+        [(0, 5), (3, 1)],
+        [(0, 2)]
+    ]
+    print(dijkstra(test_case_1, 0))
+    print(dijkstra(test_case_1, 2))
+    print(dijkstra(test_case_1, 2, target=0))
+    ctx = DijkstraContext(test_case_1)
+    print(ctx.bidirectional(1, 0), ctx.path(0))
+    print(ctx.batch([(0, 2), (0, 3), (3, 1)]))
+    print(astar(test_case_1, 0, 3, lambda v, t: 0), bidirectional_dijkstra(test_case_1, 0, 3))
+    bench_queries(300, 100)
+
+if __name__ == '__main__':
+    main()
@@ -10,8 +10,25 @@ Floyd Warshall algorithm finds the shortest path between any 2 vertices
 @created: 08212024
 '''
 
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import importlib
+import struct
+import sys
 import time
+import multiprocessing
+from ..dijkstra.dijkstra import dijkstra
+from ..graph.graph import CSRGraph
+from ..graph.sharedarrays import SharedArrays, shared_array
+
+## a hyphenated sibling package cannot be named in an import statement
+bellman_ford = importlib.import_module(
+    "..bellman-ford.bellmanford", __package__
+).bellman_ford
+
+try:
+    import numpy as np
+except ImportError: ## numpy engines are unavailable without numpy
+    np = None
 
 INF: "int" = 10**18
 
@@ -94,28 +111,103 @@ def fw_recur_helper_2(
     lose_it = fw_recur_helper_2(adjMat, i, j, k - 1)
     return min(use_it, lose_it)
 
-def fw_recur(
+def fw_recur_helper_3(
     adjMat: "List[List[int]]",
-    use_list: "bool"=False
+    i: "int",
+    j: "int",
+    k: "int",
+    memo: "List[List[List[int]]]"
+) -> "int":
+    '''
+    floyd warshall recursion helper function 3
+    same recursion as helper function 2,
+    but every (k, i, j) subproblem is solved only once
+    and kept in memo
+
+    Params
+    ----------
+        adjMat List[List[int]]: adjacent matrix
+        i int: calculate shortest path from the i th vertex in graph
+        j int: calculate shortest path to the j th vertex in graph
+        k int: index of current highest order vertex being explored
+        memo List[List[List[int]]]: n x n x n cache,
+            memo[k][i][j] is the answer for (i, j, k),
+            None if not solved yet
+
+    Returns
+    ----------
+        int:  the shorter distance between
+            going through the k th vertex from the i th to the j th
+            and going directly from i th to j th
+    '''
+    ## base call, no available vertex between i and j
+    if k < 0:
+        return adjMat[i][j]
+    ## solved before
+    if memo[k][i][j] is not None:
+        return memo[k][i][j]
+    ## recursive calls
+    use_it = fw_recur_helper_3(
+        adjMat, i, k, k - 1, memo
+    ) + fw_recur_helper_3(
+        adjMat, k, j, k - 1, memo
+    )
+    ## lose it, i => j, potentially through other points in k
+    lose_it = fw_recur_helper_3(adjMat, i, j, k - 1, memo)
+    memo[k][i][j] = min(use_it, lose_it)
+    return memo[k][i][j]
+
+def fw_recur(
+    adjMat: "List[List[int]] | CSRGraph",
+    use_list: "bool"=False,
+    use_memo: "bool"=False
 ) -> "List[List[int]]":
     '''
     floyd warshall with recursion
 
     Params
     ----------
-        adjMat List[List[int]]: adjacency matrix
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
         use_list bool: flag for use helper function that 
             uses a list of vertices
+        use_memo bool: flag for use helper function that
+            shares one memo table across all pairs,
+            O(n^3) instead of exponential, overrides use_list
 
     Returns
     ----------
         List[List[int]]: a matrix noting shortest path
             between any two vertices
     '''
+    if isinstance(adjMat, CSRGraph):
+        adjMat = adjMat.to_adjmat()
     ## initialize result matrix
     ans = [
         [0 for _ in range(len(adjMat[0]))] for _ in range(len(adjMat))
     ]
+    if use_memo:
+        n = len(adjMat)
+        ## the memo has one slot per subproblem with k >= 0,
+        ## k = -1 is read straight from adjMat
+        memo = [
+            [[None] * n for _ in range(n)] for _ in range(n)
+        ]
+        ## every call goes one vertex down, so the recursion adds
+        ## n + 1 frames at most on top of the frames already in use
+        depth = 0
+        frame = sys._getframe()
+        while frame:
+            depth += 1
+            frame = frame.f_back
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, depth + n + 100))
+        try:
+            for i in range(n):
+                for j in range(n):
+                    ans[i][j] = fw_recur_helper_3(adjMat, i, j, n - 1, memo)
+        finally:
+            sys.setrecursionlimit(limit)
+        return ans
     ## for each pair of src and dest, find shortest path
     for i in range(len(adjMat)):
         for j in range(len(adjMat[0])):
@@ -129,17 +221,15 @@ def fw_recur(
                 )
     return ans
 
-'''
-TODO recursion with memoization
-'''
-
-def fw_dp(adjMat: "List[List[int]]") -> "List[List[List[int]]]":
+def fw_dp(
+    adjMat: "List[List[int]] | CSRGraph"
+) -> "List[List[List[int]]]":
     '''
     floyd warshall with dynamic programming
 
     Params
     ----------
-        adjMat List[List[int]]: adjacency matrix
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
 
     Returns
     ----------
@@ -149,6 +239,8 @@ def fw_dp(adjMat: "List[List[int]]") -> "List[List[List[int]]]":
             second dimension represents src
             third dimension represents dest
     '''
+    if isinstance(adjMat, CSRGraph):
+        adjMat = adjMat.to_adjmat()
     n = len(adjMat)
     dp = [
         [
@@ -312,6 +404,747 @@ def reconstruct_helper2(
         reconstruct_helper2(dp, i, k-1, k-1, ans)
         reconstruct_helper2(dp, k-1, j, k-1,ans)
 
+def _weight_dtype(adjMat: "List[List[int]] | CSRGraph") -> "np.dtype":
+    '''
+    integers stay exact, float is only used when the weights need it
+    '''
+    if isinstance(adjMat, CSRGraph):
+        floating = adjMat.weights.typecode == "d"
+    elif isinstance(adjMat, np.ndarray):
+        floating = np.issubdtype(adjMat.dtype, np.floating)
+    else:
+        floating = any(isinstance(w, float) for row in adjMat for w in row)
+    return np.dtype(np.float64 if floating else np.int64)
+
+def _as_matrix(adjMat: "List[List[int]] | CSRGraph") -> "np.ndarray":
+    '''
+    copy an adjacency matrix or a sparse graph into an n x n numpy array,
+    same as CSRGraph.to_adjmat for a sparse graph
+    '''
+    n = len(adjMat)
+    dtype = _weight_dtype(adjMat)
+    if not isinstance(adjMat, CSRGraph):
+        return np.array(adjMat, dtype=dtype).reshape(n, n)
+    (indptr, indices, weights) = adjMat.to_numpy()
+    mat = np.full((n, n), INF, dtype=dtype)
+    np.fill_diagonal(mat, 0)
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    ## keep the lightest of parallel edges
+    np.minimum.at(mat, (rows, indices), weights)
+    return mat
+
+def _init_next(adj: "np.ndarray") -> "np.ndarray":
+    '''
+    next-hop matrix before going through any vertex,
+    neighbors go directly to the destination, -1 for no edge
+    '''
+    n = len(adj)
+    nxt = np.full((n, n), -1, dtype=np.int32)
+    src, dst = np.nonzero(adj < INF)
+    nxt[src, dst] = dst
+    np.fill_diagonal(nxt, np.arange(n, dtype=np.int32))
+    return nxt
+
+def fw_numpy(
+    adjMat: "List[List[int]] | CSRGraph"
+) -> "Tuple[np.ndarray, np.ndarray]":
+    '''
+    floyd warshall vectorized with numpy
+    instead of keeping all n + 1 planes of the dp table,
+    relax a single n x n distance matrix in place,
+    one broadcast per pivot vertex
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
+
+    Returns
+    ----------
+        Tuple[np.ndarray, np.ndarray] : two n x n matrices
+            the first one is the same as the last plane of fw_dp
+            the second one is the next-hop matrix,
+                nxt[i][j] is the vertex right after i
+                on the shortest path from i to j, -1 if no path
+    '''
+    if np is None:
+        raise ImportError("fw_numpy requires numpy")
+    n = len(adjMat)
+    dist = _as_matrix(adjMat)
+    nxt = _init_next(dist)
+    ## scratch buffers reused by every pivot
+    thru = np.empty_like(dist)
+    better = np.empty((n, n), dtype=bool)
+    hop = np.empty((n, 1), dtype=nxt.dtype)
+    for k in range(n):
+        ## use it: i => k => j, for every (i, j) at once
+        np.add(dist[:, k, None], dist[None, k, :], out=thru)
+        np.less(thru, dist, out=better)
+        ## the first hop towards j is now the first hop towards k,
+        ## copied out first since column k itself may be overwritten
+        hop[:, 0] = nxt[:, k]
+        np.copyto(nxt, hop, where=better)
+        ## lose it or use it
+        np.minimum(dist, thru, out=dist)
+    return dist, nxt
+
+def reconstruct_path_next(nxt: "np.ndarray", i: "int", j: "int") -> "List[int]":
+    '''
+    reconstruct the shortest path from the i th vertex to the j th vertex
+        by following the next-hop matrix, O(path length)
+
+    Params
+    ----------
+        nxt np.ndarray: next-hop matrix returned by fw_numpy
+        i int: index of starting vertex
+        j int: index of ending vertex
+
+    Returns
+    ----------
+        List[int] : shortest path from i to j, empty if no path
+    '''
+    if nxt[i][j] < 0: return []
+    path = [i]
+    ## a simple path never has more than n vertices,
+    ## anything longer is walking around a negative cycle
+    for _ in range(len(nxt)):
+        if i == j: return path
+        i = int(nxt[i][j])
+        ## hit an unreachable leg
+        if i < 0: return []
+        path.append(i)
+    return []
+
+def fw_panel(
+    dist: "np.ndarray",
+    r0: "int",
+    r1: "int",
+    c0: "int",
+    c1: "int",
+    k0: "int",
+    k1: "int"
+) -> "None":
+    '''
+    relax the tile dist[r0:r1, c0:c1] through the vertices in [k0, k1)
+    one vertex after another, for tiles that share rows or columns
+    with the diagonal block [k0, k1) x [k0, k1)
+
+    Params
+    ----------
+        dist np.ndarray: distance matrix, updated in place
+        r0 int, r1 int: rows of the tile
+        c0 int, c1 int: columns of the tile
+        k0 int, k1 int: vertices to go through
+
+    Returns
+    ----------
+        None: the tile is updated in place
+    '''
+    tile = dist[r0:r1, c0:c1]
+    for k in range(k0, k1):
+        np.minimum(
+            tile, dist[r0:r1, k, None] + dist[None, k, c0:c1], out=tile
+        )
+
+def fw_minplus(
+    dist: "np.ndarray",
+    r0: "int",
+    r1: "int",
+    c0: "int",
+    c1: "int",
+    k0: "int",
+    k1: "int"
+) -> "None":
+    '''
+    relax the tile dist[r0:r1, c0:c1] through every vertex in [k0, k1)
+    at once, a min-plus product of dist[r0:r1, k0:k1] and dist[k0:k1, c0:c1]
+    only valid when those two panels no longer change
+
+    Params
+    ----------
+        dist np.ndarray: distance matrix, updated in place
+        r0 int, r1 int: rows of the tile
+        c0 int, c1 int: columns of the tile
+        k0 int, k1 int: vertices to go through
+
+    Returns
+    ----------
+        None: the tile is updated in place
+    '''
+    a = dist[r0:r1, k0:k1]
+    b = dist[k0:k1, c0:c1]
+    tile = dist[r0:r1, c0:c1]
+    np.minimum(tile, (a[:, :, None] + b[None, :, :]).min(axis=1), out=tile)
+
+def fw_blocked(
+    adjMat: "List[List[int]] | CSRGraph",
+    tile: "int"=64
+) -> "np.ndarray":
+    '''
+    floyd warshall with cache blocking
+    the matrix is cut into tile x tile blocks and for each diagonal block
+        1. the diagonal block is solved on its own
+        2. the blocks in its row and its column go through it
+        3. every remaining block goes through the row and column blocks
+    so each round works on a few blocks that stay in cache
+    instead of streaming the whole matrix once per vertex
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
+        tile int: side length of a block
+
+    Returns
+    ----------
+        np.ndarray : shortest distances,
+            the same as the last plane of fw_dp for integer weights
+    '''
+    if np is None:
+        raise ImportError("fw_blocked requires numpy")
+    n = len(adjMat)
+    dist = _as_matrix(adjMat)
+    tile = max(1, tile)
+    for k0 in range(0, n, tile):
+        k1 = min(k0 + tile, n)
+        ## phase 1: diagonal block, plain floyd warshall inside it
+        fw_panel(dist, k0, k1, k0, k1, k0, k1)
+        ## phase 2: blocks in the row and column of the diagonal block
+        for b0 in range(0, n, tile):
+            if b0 == k0: continue
+            b1 = min(b0 + tile, n)
+            fw_panel(dist, k0, k1, b0, b1, k0, k1)
+            fw_panel(dist, b0, b1, k0, k1, k0, k1)
+        ## phase 3: every other block, row and column blocks are final now
+        for r0 in range(0, n, tile):
+            if r0 == k0: continue
+            r1 = min(r0 + tile, n)
+            for c0 in range(0, n, tile):
+                if c0 == k0: continue
+                fw_minplus(dist, r0, r1, c0, min(c0 + tile, n), k0, k1)
+    return dist
+
+def _fw_task(task: "Tuple") -> "None":
+    '''
+    run one fw_parallel task on the shared distance matrix
+
+    Params
+    ----------
+        task Tuple: (kind, tile, k0, k1, r0, r1, c0, c1)
+            kind "panel" runs fw_panel on one block,
+            kind "strip" runs fw_minplus on every block
+            of rows [r0, r1) except the one in columns [k0, k1)
+    '''
+    (kind, tile, k0, k1, r0, r1, c0, c1) = task
+    dist = shared_array("dist")
+    if kind == "panel":
+        fw_panel(dist, r0, r1, c0, c1, k0, k1)
+        return
+    n = len(dist)
+    for c0 in range(0, n, tile):
+        if c0 == k0: continue
+        fw_minplus(dist, r0, r1, c0, min(c0 + tile, n), k0, k1)
+
+def fw_parallel(
+    adjMat: "List[List[int]] | CSRGraph",
+    workers: "int"=None,
+    tile: "int"=64
+) -> "Tuple[np.ndarray, Dict[str, float]]":
+    '''
+    fw_blocked spread over a pool of processes
+    the distance matrix lives in shared memory,
+    phase 2 blocks and phase 3 row strips of each round
+    are handed out to the pool, waiting for all of them
+    before the next phase starts,
+    each block is relaxed exactly like in fw_blocked
+    so the result is bit-identical
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
+        workers int: number of processes, defaults to the cpu count,
+            1 runs everything in this process
+        tile int: side length of a block
+
+    Returns
+    ----------
+        Tuple[np.ndarray, Dict[str, float]] : shortest distances
+            and seconds spent in each phase, summed over all rounds
+    '''
+    if np is None:
+        raise ImportError("fw_parallel requires numpy")
+    total = time.perf_counter()
+    n = len(adjMat)
+    workers = workers or multiprocessing.cpu_count()
+    tile = max(1, tile)
+    src = _as_matrix(adjMat)
+    timings = {"setup": 0.0, "phase1": 0.0, "phase2": 0.0, "phase3": 0.0}
+    with SharedArrays() as shared:
+        dist = shared.share("dist", src)
+        shared.start(workers)
+        timings["setup"] = time.perf_counter() - total
+        for k0 in range(0, n, tile):
+            k1 = min(k0 + tile, n)
+            ## phase 1: a single block, not worth a round trip
+            start = time.perf_counter()
+            fw_panel(dist, k0, k1, k0, k1, k0, k1)
+            timings["phase1"] += time.perf_counter() - start
+            ## phase 2: the row and column blocks are independent
+            start = time.perf_counter()
+            tasks = []
+            for b0 in range(0, n, tile):
+                if b0 == k0: continue
+                b1 = min(b0 + tile, n)
+                tasks.append(("panel", tile, k0, k1, k0, k1, b0, b1))
+                tasks.append(("panel", tile, k0, k1, b0, b1, k0, k1))
+            shared.map(_fw_task, tasks)
+            timings["phase2"] += time.perf_counter() - start
+            ## phase 3: each row strip only reads the final row blocks
+            start = time.perf_counter()
+            tasks = [
+                ("strip", tile, k0, k1, r0, min(r0 + tile, n), 0, n)
+                for r0 in range(0, n, tile) if r0 != k0
+            ]
+            shared.map(_fw_task, tasks)
+            timings["phase3"] += time.perf_counter() - start
+        ans = dist.copy()
+        ## the block can only be closed once no view of it is left
+        del dist
+    timings["total"] = time.perf_counter() - total
+    return ans, timings
+
+def bench_blocked(
+    sizes: "List[int]",
+    tiles: "List[int]",
+    density: "float"=0.3,
+    seed: "int"=0
+) -> "List[Tuple[int, int, float]]":
+    '''
+    sweep tile sizes against graph sizes for fw_blocked,
+    with fw_numpy as the untiled baseline (tile 0)
+
+    Params
+    ----------
+        sizes List[int]: numbers of vertices to try
+        tiles List[int]: tile sizes to try
+        density float: probability of an edge between two vertices
+        seed int: seed of the random graphs
+
+    Returns
+    ----------
+        List[Tuple[int, int, float]] : (n, tile, seconds) for each run
+    '''
+    import random
+    rng = random.Random(seed)
+    rslt = []
+    for n in sizes:
+        adjMat = [
+            [
+                0 if i == j else (
+                    rng.randint(1, 100) if rng.random() < density else INF
+                ) for j in range(n)
+            ] for i in range(n)
+        ]
+        start = time.perf_counter()
+        fw_numpy(adjMat)
+        rslt.append((n, 0, time.perf_counter() - start))
+        for tile in tiles:
+            start = time.perf_counter()
+            fw_blocked(adjMat, tile)
+            rslt.append((n, tile, time.perf_counter() - start))
+    for (n, tile, dur) in rslt:
+        print(f"n={n}\ttile={tile if tile else 'none'}\t{dur:.4f}")
+    return rslt
+
+class APSPIndex():
+    '''
+    all pairs shortest paths kept up to date under edge updates
+    built once with fw_numpy, then
+        decrease_edge relaxes every pair through the new edge, O(n^2)
+        increase_edge / remove_edge only rerun floyd warshall
+            on the rows (or columns) whose shortest paths used the edge
+    assumes the graph has no negative cycle
+    '''
+    def __init__(self, adjMat: "List[List[int]] | CSRGraph") -> "None":
+        self.adj = _as_matrix(adjMat)
+        self.dist, self.nxt = fw_numpy(self.adj)
+
+    def __len__(self) -> "int":
+        return len(self.adj)
+
+    def distance(self, u: "int", v: "int") -> "int":
+        '''
+        length of the shortest path from u to v, INF if no path
+        '''
+        if self.nxt[u, v] < 0: return INF
+        return self.dist[u, v].item()
+
+    def path(self, u: "int", v: "int") -> "List[int]":
+        '''
+        shortest path from u to v, empty if no path
+        '''
+        return reconstruct_path_next(self.nxt, u, v)
+
+    def decrease_edge(self, u: "int", v: "int", w: "int") -> "None":
+        '''
+        lower the weight of edge (u, v) to w, adding it if missing
+
+        Params
+        ----------
+            u int: start of the edge
+            v int: end of the edge
+            w int: new weight, no larger than the current one
+        '''
+        if w > self.adj[u, v]:
+            raise ValueError(
+                f"new weight {w} is larger than {self.adj[u, v]}, "
+                + "use increase_edge"
+            )
+        self.adj[u, v] = w
+        dist, nxt = self.dist, self.nxt
+        ## only pairs i => u and v => j that exist can use the edge
+        reach_u = nxt[:, u] >= 0
+        from_v = nxt[v, :] >= 0
+        thru = dist[:, u, None] + w + dist[None, v, :]
+        better = (thru < dist) & reach_u[:, None] & from_v[None, :]
+        if not better.any(): return
+        ## first hop towards j is the first hop towards u,
+        ## or v itself when starting from u
+        hop = nxt[:, u].copy()
+        hop[u] = v
+        np.copyto(nxt, hop[:, None], where=better)
+        np.copyto(dist, thru, where=better)
+
+    def increase_edge(self, u: "int", v: "int", w: "int") -> "None":
+        '''
+        raise the weight of edge (u, v) to w, INF removes it
+
+        Params
+        ----------
+            u int: start of the edge
+            v int: end of the edge
+            w int: new weight, no smaller than the current one
+        '''
+        old = self.adj[u, v].item()
+        if w < old:
+            raise ValueError(
+                f"new weight {w} is smaller than {old}, use decrease_edge"
+            )
+        self.adj[u, v] = min(w, INF)
+        if old >= INF or u == v: return
+        dist, nxt = self.dist, self.nxt
+        ## sources whose shortest path to v may use the edge,
+        ## every other row cannot get worse
+        rows = np.flatnonzero(
+            (nxt[:, u] >= 0) & (dist[:, u] + old == dist[:, v])
+        )
+        ## destinations whose shortest path from u may use the edge
+        cols = np.flatnonzero(
+            (nxt[v, :] >= 0) & (dist[u, :] == old + dist[v, :])
+        )
+        if len(rows) <= len(cols):
+            self._refresh_rows(rows)
+        else:
+            self._refresh_cols(cols)
+
+    def remove_edge(self, u: "int", v: "int") -> "None":
+        '''
+        remove edge (u, v)
+        '''
+        self.increase_edge(u, v, INF)
+
+    def _refresh_rows(self, rows: "np.ndarray") -> "None":
+        '''
+        rerun floyd warshall for the given source rows only,
+        the other rows are already final
+        '''
+        if not len(rows): return
+        dist, nxt = self.dist, self.nxt
+        sub = self.adj[rows].copy()
+        sub_nxt = np.full(sub.shape, -1, dtype=nxt.dtype)
+        src, dst = np.nonzero(sub < INF)
+        sub_nxt[src, dst] = dst
+        sub_nxt[np.arange(len(rows)), rows] = rows
+        dist[rows] = sub
+        nxt[rows] = sub_nxt
+        for k in range(len(dist)):
+            sub = dist[rows]
+            thru = sub[:, k, None] + dist[None, k, :]
+            better = thru < sub
+            sub_nxt = nxt[rows]
+            np.copyto(sub_nxt, sub_nxt[:, k, None].copy(), where=better)
+            nxt[rows] = sub_nxt
+            dist[rows] = np.minimum(sub, thru)
+
+    def _refresh_cols(self, cols: "np.ndarray") -> "None":
+        '''
+        rerun floyd warshall for the given destination columns only,
+        the other columns are already final
+        '''
+        if not len(cols): return
+        dist, nxt = self.dist, self.nxt
+        sub = self.adj[:, cols].copy()
+        sub_nxt = np.full(sub.shape, -1, dtype=nxt.dtype)
+        src, dst = np.nonzero(sub < INF)
+        sub_nxt[src, dst] = cols[dst]
+        sub_nxt[cols, np.arange(len(cols))] = cols
+        dist[:, cols] = sub
+        nxt[:, cols] = sub_nxt
+        for k in range(len(dist)):
+            sub = dist[:, cols]
+            thru = dist[:, k, None] + sub[None, k, :]
+            better = thru < sub
+            sub_nxt = nxt[:, cols]
+            np.copyto(sub_nxt, nxt[:, k, None], where=better)
+            nxt[:, cols] = sub_nxt
+            dist[:, cols] = np.minimum(sub, thru)
+
+## header of a saved apsp result, little endian:
+## magic, version, dtype of distances, n, INF, offset of dist, offset of nxt
+APSP_MAGIC: "bytes" = b"APSP"
+APSP_HEADER: "str" = "<4sHcxQqQQ"
+APSP_ALIGN: "int" = 64
+
+def save_apsp(path: "str", dist: "np.ndarray", nxt: "np.ndarray") -> "None":
+    '''
+    save an all pairs shortest path result,
+    the distance matrix and the next-hop matrix,
+    to a binary file that load_apsp can memory map
+
+    Params
+    ----------
+        path str: file to write
+        dist np.ndarray: n x n distance matrix, e.g. from fw_numpy
+        nxt np.ndarray: n x n next-hop matrix, e.g. from fw_numpy
+
+    Returns
+    ----------
+        None
+    '''
+    if np is None:
+        raise ImportError("save_apsp requires numpy")
+    n = len(dist)
+    code = b"d" if np.issubdtype(np.asarray(dist).dtype, np.floating) else b"q"
+    dtype = np.dtype("<f8" if code == b"d" else "<i8")
+    ## keep both matrices aligned so the mapped arrays are too
+    size = struct.calcsize(APSP_HEADER)
+    dist_off = -(-size // APSP_ALIGN) * APSP_ALIGN
+    nxt_off = -(-(dist_off + n * n * 8) // APSP_ALIGN) * APSP_ALIGN
+    with open(path, "wb") as f:
+        f.write(struct.pack(
+            APSP_HEADER, APSP_MAGIC, 1, code, n, INF, dist_off, nxt_off
+        ))
+        f.truncate(nxt_off + n * n * 4)
+    if not n: return
+    out = np.memmap(path, dtype=dtype, mode="r+", offset=dist_off, shape=(n, n))
+    out[:] = dist
+    out.flush()
+    del out
+    out = np.memmap(path, dtype="<i4", mode="r+", offset=nxt_off, shape=(n, n))
+    out[:] = nxt
+    out.flush()
+    del out
+
+def load_apsp(
+    path: "str",
+    mode: "str"="r"
+) -> "Tuple[np.ndarray, np.ndarray]":
+    '''
+    memory map an all pairs shortest path result saved by save_apsp,
+    nothing is read until it is used and processes mapping the same file
+    share one copy through the page cache
+
+    Params
+    ----------
+        path str: file to open
+        mode str: "r" for read only, "r+" to update the file in place,
+            "c" for private copy on write
+
+    Returns
+    ----------
+        Tuple[np.ndarray, np.ndarray] : the distance matrix
+            and the next-hop matrix, usable with reconstruct_path_next
+    '''
+    if np is None:
+        raise ImportError("load_apsp requires numpy")
+    with open(path, "rb") as f:
+        header = f.read(struct.calcsize(APSP_HEADER))
+    (magic, version, code, n, inf, dist_off, nxt_off) = struct.unpack(
+        APSP_HEADER, header
+    )
+    if magic != APSP_MAGIC or version != 1:
+        raise ValueError(f"{path} is not an apsp result file")
+    if inf != INF:
+        raise ValueError(f"{path} was saved with INF = {inf}, not {INF}")
+    dtype = np.dtype("<f8" if code == b"d" else "<i8")
+    if not n:
+        return np.empty((0, 0), dtype=dtype), np.empty((0, 0), dtype="<i4")
+    dist = np.memmap(path, dtype=dtype, mode=mode, offset=dist_off, shape=(n, n))
+    nxt = np.memmap(path, dtype="<i4", mode=mode, offset=nxt_off, shape=(n, n))
+    return dist, nxt
+
+def johnson(
+    adjMat: "List[List[int]] | CSRGraph"
+) -> "Tuple[np.ndarray | List[List[int]], np.ndarray | List[List[int]], List[int]]":
+    '''
+    Johnson algorithm
+    Bellman Ford from a virtual source gives each vertex a potential h,
+    reweighting every edge (u, v) to w + h[u] - h[v] makes it non negative
+    without changing shortest paths, then Dijkstra runs from every vertex
+    O(nm log n), better than floyd warshall on sparse graphs
+    with numpy both n x n matrices are allocated once and every source
+    writes its row straight into them, lists of lists only without numpy
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
+
+    Returns
+    ----------
+        Tuple[np.ndarray | List[List[int]], np.ndarray | List[List[int]], List[int]] :
+            distance matrix, next-hop matrix (see fw_numpy)
+            and the vertices of a negative cycle,
+            both matrices are None when there is a negative cycle
+    '''
+    n = len(adjMat)
+    if isinstance(adjMat, CSRGraph):
+        edges = [
+            (u, v, w) for (u, v, w) in adjMat.edges() if u != v or w < 0
+        ]
+    else:
+        edges = [
+            (i, j, adjMat[i][j])
+            for i in range(n)
+            for j in range(n)
+            if adjMat[i][j] < INF and (i != j or adjMat[i][j] < 0)
+        ]
+    (h, _, cycle) = bellman_ford(n, edges)
+    if cycle: return (None, None, cycle)
+    adjList = [[] for _ in range(n)]
+    for (u, v, w) in edges:
+        adjList[u].append((v, w + h[u] - h[v]))
+    if np is None:
+        (dist, nxt) = ([], [])
+    else:
+        dtype = _weight_dtype(adjMat)
+        dist = np.empty((n, n), dtype=dtype)
+        nxt = np.empty((n, n), dtype=np.int32)
+        hv = np.array(h, dtype=dtype)
+    for s in range(n):
+        (d, prev) = dijkstra(adjList, s)
+        ## undo the reweighting
+        if np is None:
+            dist.append([
+                d[v] - h[s] + h[v] if d[v] < INF else INF for v in range(n)
+            ])
+        else:
+            row = np.array(d, dtype=dtype)
+            dist[s] = np.where(row < INF, row - h[s] + hv, INF)
+        ## first hop of each path, found by walking back along prev
+        first = [-1] * n
+        first[s] = s
+        for v in range(n):
+            if first[v] >= 0 or prev[v] < 0: continue
+            stack = []
+            u = v
+            while first[u] < 0 and prev[u] != s:
+                stack.append(u)
+                u = prev[u]
+            hop = u if first[u] < 0 else first[u]
+            first[u] = hop
+            for u in stack:
+                first[u] = hop
+        if np is None:
+            nxt.append(first)
+        else:
+            nxt[s] = first
+    return (dist, nxt, [])
+
+def fw_negative_cycle(
+    adjMat: "List[List[int]]",
+    dist: "np.ndarray",
+    nxt: "np.ndarray"
+) -> "List[int]":
+    '''
+    find a negative cycle after floyd warshall,
+    a vertex with a negative distance to itself lies on one
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
+        dist np.ndarray: distance matrix from fw_numpy
+        nxt np.ndarray: next-hop matrix from fw_numpy
+
+    Returns
+    ----------
+        List[int] : vertices of a negative cycle in order, empty if none
+    '''
+    starts = np.flatnonzero(np.diagonal(dist) < 0)
+    if not len(starts): return []
+    mat = _as_matrix(adjMat)
+    for i in starts.tolist():
+        ## follow the next hops towards i until a vertex repeats
+        seen = {}
+        walk = []
+        u = i
+        while u >= 0 and u not in seen:
+            seen[u] = len(walk)
+            walk.append(u)
+            u = int(nxt[u][i])
+        if u < 0: continue
+        cycle = walk[seen[u]:]
+        weight = sum(
+            mat[a, b].item() for (a, b) in zip(cycle, cycle[1:] + cycle[:1])
+        )
+        if weight < 0: return cycle
+    ## next hops are not reliable around negative cycles,
+    ## fall back to Bellman Ford
+    edge = mat < INF
+    np.fill_diagonal(edge, np.diagonal(mat) < 0)
+    (src, dst) = np.nonzero(edge)
+    edges = list(zip(src.tolist(), dst.tolist(), mat[src, dst].tolist()))
+    return bellman_ford(len(mat), edges)[2]
+
+def apsp(
+    adjMat: "List[List[int]] | CSRGraph",
+    density: "float"=0.01
+) -> "Tuple[Optional[np.ndarray], Optional[np.ndarray], List[int]]":
+    '''
+    all pairs shortest paths, picking the algorithm by edge density
+    Johnson algorithm for sparse graphs, fw_numpy for dense ones
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix or sparse graph
+        density float: use Johnson algorithm when the number of edges
+            is below density * n^2
+
+    Returns
+    ----------
+        Tuple[Optional[np.ndarray], Optional[np.ndarray], List[int]] :
+            distance matrix, next-hop matrix
+            and the vertices of a negative cycle,
+            both matrices are None when there is a negative cycle
+    '''
+    n = len(adjMat)
+    if isinstance(adjMat, CSRGraph):
+        m = adjMat.num_edges()
+    else:
+        m = sum(
+            1 for i in range(n) for j in range(n)
+            if i != j and adjMat[i][j] < INF
+        )
+    if np is None or m < density * n * n:
+        return johnson(adjMat)
+    mat = _as_matrix(adjMat)
+    (dist, nxt) = fw_numpy(mat)
+    cycle = fw_negative_cycle(mat, dist, nxt)
+    if cycle: return (None, None, cycle)
+    ## negative edges pull unreachable pairs slightly below INF,
+    ## report them as unreachable like Johnson algorithm does
+    unreachable = dist >= INF // 2
+    dist[unreachable] = INF
+    nxt[unreachable] = -1
+    return (dist, nxt, [])
+
 ## TODO Hirshberg method
 
 
@@ -339,6 +1172,12 @@ def main():
         recur2 = fw_recur(test_case_2)
     end = time.time()
     dur2 = end - start
+    start = time.time()
+    for _ in range(10000):
+        recur1m = fw_recur(test_case_1, use_memo=True)
+        recur2m = fw_recur(test_case_2, use_memo=True)
+    end = time.time()
+    dur_memo = end - start
     # for rslt in [recur1_, recur2_, recur1, recur2]:
     #     for row in rslt: print(row)
     #     print('\n')
@@ -357,7 +1196,16 @@ def main():
     # print('=' * 20)
     print(f"duration of recursion with list: {dur1:.4f}")
     print(f"duration of recursion with index: {dur2:.4f}")
+    print(f"duration of recursion with memo: {dur_memo:.4f}")
     print(f"duration of dp: {dur3:.4f}")
+    if np is not None:
+        start = time.time()
+        for _ in range(10000):
+            fw_numpy(test_case_1)
+            fw_numpy(test_case_2)
+        end = time.time()
+        print(f"duration of numpy: {end - start:.4f}")
+        bench_blocked([128, 256], [16, 32, 64, 128])
     sol1 = fw_dp(test_case_1)
     # for i in range(len(test_case_1)):
     #     for j in range(len(test_case_1)):
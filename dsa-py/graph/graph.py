@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+'''
+compact sparse graph shared by the graph algorithms
+
+a graph with n vertices and m edges is kept in compressed sparse row
+(CSR) form, three flat arrays instead of an n x n adjacency matrix
+    indptr:  n + 1 offsets, edges of vertex u are indptr[u]:indptr[u + 1]
+    indices: m ends of the edges, grouped by start vertex
+    weights: m weights, aligned with indices
+so memory is O(n + m) and scanning the neighbors of u is O(degree)
+
+@author: Gavin Li
+@email: liguangzheng998@hotmail.com
+@created: 10182026
+'''
+
+from array import array
+from typing import Iterable, Iterator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError: ## to_numpy is unavailable without numpy
+    np = None
+
+INF: "int" = 10**18
+
+class CSRGraph():
+    def __init__(
+        self,
+        indptr: "array",
+        indices: "array",
+        weights: "array"
+    ) -> "None":
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    def __len__(self) -> "int":
+        return len(self.indptr) - 1
+
+    def __getitem__(self, u: "int") -> "List[Tuple[int, int]]":
+        ## same shape as a row of an adjacency list
+        return list(self.neighbors(u))
+
+    def __str__(self) -> "str":
+        return f"<CSRGraph: {len(self)} vertices, {self.num_edges()} edges>"
+
+    def __repr__(self) -> "str":
+        return f"<CSRGraph: {len(self)} vertices, {self.num_edges()} edges>"
+
+    def num_edges(self) -> "int":
+        return len(self.indices)
+
+    def degree(self, u: "int") -> "int":
+        return self.indptr[u + 1] - self.indptr[u]
+
+    def neighbors(self, u: "int") -> "Iterator[Tuple[int, int]]":
+        '''
+        (neighbor, weight) of every edge going out of u
+        '''
+        (st, end) = (self.indptr[u], self.indptr[u + 1])
+        return zip(self.indices[st:end], self.weights[st:end])
+
+    def edges(self) -> "Iterator[Tuple[int, int, int]]":
+        '''
+        (start, end, weight) of every edge, grouped by start
+        '''
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        for u in range(len(self)):
+            for e in range(indptr[u], indptr[u + 1]):
+                yield (u, indices[e], weights[e])
+
+    @classmethod
+    def from_edges(
+        cls,
+        n: "int",
+        edges: "Iterable[Tuple[int, int, int]]",
+        directed: "bool"=True
+    ) -> "CSRGraph":
+        '''
+        build the graph from an edge list
+
+        Params
+        ----------
+            n int: number of vertices
+            edges Iterable[Tuple[int, int, int]]: (start, end, weight)
+            directed bool: False stores every edge in both directions
+
+        Returns
+        ----------
+            CSRGraph : the graph, edges of each vertex in input order
+        '''
+        edges = edges if isinstance(edges, list) else list(edges)
+        if not directed:
+            edges = edges + [(v, u, w) for (u, v, w) in edges]
+        ## counting sort by start vertex
+        indptr = array("q", [0]) * (n + 1)
+        for (u, _, _) in edges:
+            indptr[u + 1] += 1
+        for u in range(n):
+            indptr[u + 1] += indptr[u]
+        pos = indptr[:-1]
+        code = "d" if any(isinstance(w, float) for (_, _, w) in edges) else "q"
+        indices = array("i", [0]) * len(edges)
+        weights = array(code, [0]) * len(edges)
+        for (u, v, w) in edges:
+            indices[pos[u]] = v
+            weights[pos[u]] = w
+            pos[u] += 1
+        return cls(indptr, indices, weights)
+
+    @classmethod
+    def from_adjmat(cls, adjMat: "List[List[int]]") -> "CSRGraph":
+        '''
+        build the graph from an adjacency matrix,
+        INF means no edge and a 0 on the diagonal means no self loop
+
+        Params
+        ----------
+            adjMat List[List[int]]: adjacency matrix
+
+        Returns
+        ----------
+            CSRGraph : the graph
+        '''
+        n = len(adjMat)
+        code = "q"
+        if any(isinstance(w, float) for row in adjMat for w in row):
+            code = "d"
+        indptr = array("q", [0])
+        indices = array("i")
+        weights = array(code)
+        for i in range(n):
+            row = adjMat[i]
+            for j in range(n):
+                if row[j] < INF and (i != j or row[j] != 0):
+                    indices.append(j)
+                    weights.append(row[j])
+            indptr.append(len(indices))
+        return cls(indptr, indices, weights)
+
+    def to_adjmat(self) -> "List[List[int]]":
+        '''
+        adjacency matrix of the graph, the lightest of parallel edges,
+        0 on the diagonal unless there is a negative self loop
+
+        Returns
+        ----------
+            List[List[int]] : adjacency matrix with INF for no edge
+        '''
+        n = len(self)
+        adjMat = [[INF] * n for _ in range(n)]
+        for i in range(n):
+            adjMat[i][i] = 0
+        for (u, v, w) in self.edges():
+            if w < adjMat[u][v]:
+                adjMat[u][v] = w
+        return adjMat
+
+    def to_adjlist(self) -> "List[List[Tuple[int, int]]]":
+        '''
+        adjacency list of the graph, (neighbor, weight) for each vertex
+        '''
+        return [self[u] for u in range(len(self))]
+
+    def transpose(self) -> "CSRGraph":
+        '''
+        the graph with every edge reversed, edges into each vertex
+        kept in order of their start, built array to array
+            count the edges into each vertex, prefix sums give indptr
+            then every edge is scattered to the next free slot of its end
+        with numpy the scatter order comes from a stable argsort
+        of the ends, without it a plain loop, O(n + m) either way
+        and no per edge python objects are kept
+        '''
+        n = len(self)
+        m = self.num_edges()
+        code = self.weights.typecode
+        if np is not None:
+            (indptr, indices, weights) = self.to_numpy()
+            tindptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(indices, minlength=n), out=tindptr[1:])
+            order = np.argsort(indices, kind="stable")
+            src = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+            ans = CSRGraph(array("q"), array("i"), array(code))
+            ans.indptr.frombytes(tindptr.tobytes())
+            ans.indices.frombytes(src[order].tobytes())
+            ans.weights.frombytes(weights[order].tobytes())
+            return ans
+        (indptr, indices, weights) = (self.indptr, self.indices, self.weights)
+        tindptr = array("q", [0]) * (n + 1)
+        for v in indices:
+            tindptr[v + 1] += 1
+        for v in range(n):
+            tindptr[v + 1] += tindptr[v]
+        pos = tindptr[:-1]
+        tindices = array("i", [0]) * m
+        tweights = array(code, [0]) * m
+        for u in range(n):
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                tindices[pos[v]] = u
+                tweights[pos[v]] = weights[e]
+                pos[v] += 1
+        return CSRGraph(tindptr, tindices, tweights)
+
+    def to_numpy(self) -> "Tuple[np.ndarray, np.ndarray, np.ndarray]":
+        '''
+        indptr, indices and weights as numpy arrays
+        sharing memory with the graph, no copy is made
+        '''
+        if np is None:
+            raise ImportError("to_numpy requires numpy")
+        return (
+            np.frombuffer(self.indptr, dtype=np.int64),
+            np.frombuffer(self.indices, dtype=np.int32),
+            np.frombuffer(
+                self.weights,
+                dtype=np.float64 if self.weights.typecode == "d" else np.int64
+            )
+        )
+
+def as_csr(graph: "List[List[int]] | CSRGraph") -> "CSRGraph":
+    '''
+    the graph in CSR form, converting an adjacency matrix if needed
+    '''
+    if isinstance(graph, CSRGraph): return graph
+    return CSRGraph.from_adjmat(graph)
+
+
+def main():
+    test_case_1 = [
+        [0, 3, INF, 7],
+        [8, 0, 2, INF],
+        [5, INF, 0, 1],
+        [2, INF, INF, 0]
+    ]
+    g = CSRGraph.from_adjmat(test_case_1)
+    print(g)
+    print(list(g.edges()))
+    print(g.to_adjmat() == test_case_1)
+    g = CSRGraph.from_edges(3, [(0, 1, 2), (1, 2, 1)], directed=False)
+    print(g.to_adjlist())
+
+if __name__ == '__main__':
+    main()
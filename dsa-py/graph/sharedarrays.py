@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+'''
+numpy arrays in shared memory for a pool of worker processes
+
+the parent copies its arrays once into named shared memory blocks,
+every worker maps the same blocks in its pool initializer, so tasks
+only pickle a few names and bounds instead of the data
+    shared = SharedArrays()
+    dist = shared.share("dist", mat)
+    shared.start(workers)
+    shared.map(task, tasks)     ## task reads shared_array("dist")
+    shared.close()
+with workers <= 1 there is no pool and the tasks run in this process
+on the same arrays, one code path for both
+
+@author: Gavin Li
+@email: liguangzheng998@hotmail.com
+@created: 10182026
+'''
+
+import multiprocessing
+import weakref
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError: ## SharedArrays is unavailable without numpy
+    np = None
+
+## arrays of this process by key, attached by a worker
+## or registered by the parent when it runs the tasks itself
+_attached: "Dict[str, np.ndarray]" = {}
+## blocks still in use by an array of this process, held here so
+## their mapping is not closed under the array
+_lingering: "List[shared_memory.SharedMemory]" = []
+
+def _attach(specs: "List[Tuple[str, str, str, Tuple[int, ...]]]") -> "None":
+    '''
+    pool initializer, map every shared block into this process
+
+    Params
+    ----------
+        specs List[Tuple[str, str, str, Tuple[int, ...]]]: (key,
+            shared memory name, dtype, shape) of each array
+    '''
+    for (key, name, dtype, shape) in specs:
+        shm = shared_memory.SharedMemory(name=name)
+        ## the block must stay open as long as the array is used
+        _lingering.append(shm)
+        _attached[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def shared_array(key: "str") -> "np.ndarray":
+    '''
+    the shared array of a key, for the tasks run by SharedArrays.map
+    '''
+    return _attached[key]
+
+class SharedArrays():
+    '''
+    owner of the shared blocks and the pool reading them,
+    create, start, map, then close, or use it as a context manager
+    '''
+    def __init__(self) -> "None":
+        if np is None:
+            raise ImportError("SharedArrays requires numpy")
+        self.arrays: "Dict[str, np.ndarray]" = {}
+        self.blocks: "List[shared_memory.SharedMemory]" = []
+        self.specs: "List[Tuple[str, str, str, Tuple[int, ...]]]" = []
+        self.pool = None
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc: "Any") -> "None":
+        self.close()
+
+    def create(self, key: "str", shape: "Tuple[int, ...]", dtype: "Any") -> "np.ndarray":
+        '''
+        a new uninitialized array in its own shared block
+
+        Returns
+        ----------
+            np.ndarray: the array, a view of the block
+        '''
+        if key in self.arrays:
+            raise ValueError(f"array {key} already exists")
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        ## a block cannot be empty
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        self.blocks.append(shm)
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        self.arrays[key] = arr
+        self.specs.append((key, shm.name, dtype.str, tuple(shape)))
+        return arr
+
+    def share(self, key: "str", src: "np.ndarray") -> "np.ndarray":
+        '''
+        copy an array into a new shared block
+
+        Returns
+        ----------
+            np.ndarray: the copy, a view of the block
+        '''
+        arr = self.create(key, src.shape, src.dtype)
+        arr[...] = src
+        return arr
+
+    def start(self, workers: "int") -> "None":
+        '''
+        start a pool of workers that attach every array created so far,
+        with workers <= 1 the tasks run in this process instead
+        '''
+        if workers > 1:
+            self.pool = multiprocessing.Pool(workers, _attach, (self.specs,))
+        else:
+            _attached.update(self.arrays)
+
+    def map(self, f: "Callable[[Any], Any]", tasks: "Iterable[Any]") -> "List[Any]":
+        '''
+        run f on every task, in the pool when there is one
+
+        Returns
+        ----------
+            List[Any]: the results in task order
+        '''
+        if self.pool is not None:
+            return self.pool.map(f, tasks)
+        return [f(task) for task in tasks]
+
+    def close(self) -> "None":
+        '''
+        stop the pool and free the blocks,
+        numpy views do not pin a block, closing it under a live array
+        would leave the array pointing at unmapped memory, so a block
+        whose array is still referenced stays mapped until the process
+        exits, it is unlinked all the same so nothing is left behind
+        '''
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        for (key, arr) in self.arrays.items():
+            if _attached.get(key) is arr:
+                del _attached[key]
+        ## arrays and blocks are created in pairs, in the same order
+        alive = [weakref.ref(arr) for arr in self.arrays.values()]
+        self.arrays.clear()
+        arr = None
+        for (ref, shm) in zip(alive, self.blocks):
+            if ref() is not None:
+                _lingering.append(shm)
+            else:
+                try:
+                    shm.close()
+                except BufferError:
+                    _lingering.append(shm)
+            shm.unlink()
+        self.blocks.clear()
+        self.specs.clear()
@@ -10,8 +10,25 @@ MST algorithms ...
 @created: 08252024
 '''
 
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
+from array import array
+from collections import deque
 from queue import PriorityQueue
+import heapq
+import multiprocessing
+import os
+import random
+import struct
+import tempfile
+import time
+
+try:
+    import numpy as np
+except ImportError: ## boruvka is unavailable without numpy
+    np = None
+
+from ..graph.graph import CSRGraph, as_csr
+from ..graph.sharedarrays import SharedArrays, shared_array
 
 INF: "int" = 10**18
 
@@ -30,13 +47,65 @@ class Vertex():
         return f"<Vertex: {self.idx}, distance: {self.cost}>"
 
 
-def prim(adjMat: "List[List[int]]") -> "Tuple[List[int], List[int]]":
+class DisjointSet():
+    '''
+    disjoint set (union find) over vertices 0 .. n - 1
+    kept in flat arrays, with path compression and union by rank,
+    so a find is nearly O(1) amortized
+    '''
+    def __init__(self, n: "int") -> "None":
+        self.parent = array("i", range(n))
+        ## a rank never exceeds log2(n), a byte is enough
+        self.rank = bytearray(n)
+        self.count = n
+
+    def __len__(self) -> "int":
+        return len(self.parent)
+
+    def find(self, x: "int") -> "int":
+        '''
+        representative of the set x is in
+        '''
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        ## path compression, point everything on the way to the root
+        while parent[x] != root:
+            (parent[x], x) = (root, parent[x])
+        return root
+
+    def union(self, x: "int", y: "int") -> "bool":
+        '''
+        merge the sets of x and y,
+        False if they were already the same set
+        '''
+        x = self.find(x)
+        y = self.find(y)
+        if x == y: return False
+        ## hang the shorter tree under the taller one
+        if self.rank[x] < self.rank[y]:
+            (x, y) = (y, x)
+        self.parent[y] = x
+        if self.rank[x] == self.rank[y]:
+            self.rank[x] += 1
+        self.count -= 1
+        return True
+
+    def connected(self, x: "int", y: "int") -> "bool":
+        return self.find(x) == self.find(y)
+
+
+def prim(
+    adjMat: "List[List[int]] | CSRGraph"
+) -> "Tuple[List[int], List[int]]":
     '''
     Prim algorithm
 
     Params
     ----------
-        adjMat List[List[int]]: adjacency matrix of the graph
+        adjMat List[List[int]] | CSRGraph: adjacency matrix of the graph
+            or the graph in CSR form
     
     Returns
     ----------
@@ -51,30 +120,81 @@ def prim(adjMat: "List[List[int]]") -> "Tuple[List[int], List[int]]":
     if n <= 1: return prev
     visited[0] = True
     cost[0] = 0
+    ## only the neighbors of a vertex in CSR form,
+    ## the whole row of an adjacency matrix
+    if isinstance(adjMat, CSRGraph):
+        neighbors = adjMat.neighbors
+    else:
+        neighbors = lambda u: enumerate(adjMat[u])
     pq = PriorityQueue()
-    for i in range(n):
-        if adjMat[0][i] != INF and i != 0:
-            cost[i] = adjMat[0][i]
+    for (i, w) in neighbors(0):
+        if w != INF and i != 0 and w < cost[i]:
+            cost[i] = w
             prev[i] = 0
             pq.put((cost[i], i))
     while not pq.empty() and sum(visited) > 0:
         (_, idx) = pq.get()
         visited[idx] = True
-        for i in range(n):
-            if i != idx and not visited[i] and adjMat[idx][i] != INF:
-                pq.put((adjMat[idx][i], i))
-                if adjMat[idx][i] < cost[i]:
-                    cost[i] = adjMat[idx][i]
+        for (i, w) in neighbors(idx):
+            if i != idx and not visited[i] and w != INF:
+                pq.put((w, i))
+                if w < cost[i]:
+                    cost[i] = w
                     prev[i] = idx
     return (prev, cost)
 
-def kruskal(adjMat: "List[List[int]]") -> "List[int]":
+def prim_heap(
+    adjMat: "List[List[int]] | CSRGraph"
+) -> "Tuple[List[int], List[int]]":
+    '''
+    Prim algorithm with heapq
+    no lock per push and pop like PriorityQueue,
+    an entry is pushed only when it lowers the cost of a vertex
+    and entries of vertices already in the tree are skipped when popped,
+    neighbors come from the CSR form, so O(m log n) overall
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix of the graph
+            or the graph in CSR form
+
+    Returns
+    ----------
+        Tuple[List[int], List[int]] : two lists, same as prim
+            one contains vertex node for each vertex
+            the other contains the cost from the tree to the vertex
+    '''
+    graph = as_csr(adjMat)
+    n = len(graph)
+    visited = [False] * n
+    prev = [None] * n
+    cost = [INF] * n
+    if not n: return (prev, cost)
+    indptr, indices, weights = graph.indptr, graph.indices, graph.weights
+    cost[0] = 0
+    pq = [(0, 0)]
+    while pq:
+        (c, idx) = heapq.heappop(pq)
+        ## stale entry, a cheaper edge was found or already in the tree
+        if visited[idx] or c > cost[idx]: continue
+        visited[idx] = True
+        for e in range(indptr[idx], indptr[idx + 1]):
+            i = indices[e]
+            w = weights[e]
+            if not visited[i] and w < cost[i]:
+                cost[i] = w
+                prev[i] = idx
+                heapq.heappush(pq, (w, i))
+    return (prev, cost)
+
+def kruskal(adjMat: "List[List[int]] | CSRGraph") -> "List[int]":
     '''
     Kruskal algorithm
 
     Params
     ----------
-        adjMat List[List[int]]: adjacency matrix of the graph
+        adjMat List[List[int]] | CSRGraph: adjacency matrix of the graph
+            or the graph in CSR form, every edge stored both ways
     
     Returns
     ----------
@@ -83,12 +203,15 @@ def kruskal(adjMat: "List[List[int]]") -> "List[int]":
     ## create edge list
     n = len(adjMat)
     edges = []
-    edges = [
-        (adjMat[i][j], (i, j)) 
-        for i in range(n) 
-        for j in range(i+1, n) 
-        if adjMat[i][j] != INF
-    ]
+    if isinstance(adjMat, CSRGraph):
+        edges = [(w, (i, j)) for (i, j, w) in adjMat.edges() if i < j]
+    else:
+        edges = [
+            (adjMat[i][j], (i, j)) 
+            for i in range(n) 
+            for j in range(i+1, n) 
+            if adjMat[i][j] != INF
+        ]
     ## sort edge list
     edges.sort(key=lambda x: x[0])
     # print(edges)
@@ -111,6 +234,353 @@ def kruskal(adjMat: "List[List[int]]") -> "List[int]":
         ## both visited => will form circle, don't add
     return prev
 
+def kruskal_dsu(
+    graph: "List[List[int]] | CSRGraph | Iterable[Tuple[int, int, int]]",
+    n: "Optional[int]"=None,
+    presorted: "bool"=False,
+    use_heap: "bool"=False
+) -> "Tuple[List[Tuple[int, int, int]], int]":
+    '''
+    Kruskal algorithm with a disjoint set
+    two components are merged only when an edge joins different sets,
+    and it stops as soon as n - 1 edges are in the tree
+
+    Params
+    ----------
+        graph List[List[int]] | CSRGraph | Iterable[Tuple[int, int, int]]:
+            adjacency matrix, the graph in CSR form,
+            or (start, end, weight) of every edge when n is given
+        n Optional[int]: number of vertices, only for an edge iterable
+        presorted bool: the edges already come sorted by weight,
+            consume them as a stream without sorting
+        use_heap bool: heapify the edges and pop the lightest one
+            each time, instead of sorting all of them up front
+
+    Returns
+    ----------
+        Tuple[List[Tuple[int, int, int]], int] : (start, end, weight)
+            of every edge in the minimum spanning tree (forest if the graph
+            is not connected), and the total weight
+    '''
+    if n is None:
+        n = len(graph)
+        if isinstance(graph, CSRGraph):
+            edges = ((i, j, w) for (i, j, w) in graph.edges() if i < j)
+        else:
+            edges = (
+                (i, j, graph[i][j])
+                for i in range(n)
+                for j in range(i + 1, n)
+                if graph[i][j] != INF
+            )
+    else:
+        edges = graph
+    if use_heap:
+        pq = [(w, i, j) for (i, j, w) in edges]
+        heapq.heapify(pq)
+        edges = (
+            (i, j, w) for (w, i, j) in
+            (heapq.heappop(pq) for _ in range(len(pq)))
+        )
+    elif not presorted:
+        edges = sorted(edges, key=lambda e: e[2])
+    ds = DisjointSet(n)
+    tree = []
+    total = 0
+    for (i, j, w) in edges:
+        if len(tree) >= n - 1: break
+        ## same set => will form circle, don't add
+        if ds.union(i, j):
+            tree.append((i, j, w))
+            total += w
+    return (tree, total)
+
+def read_edges(path: "str") -> "Iterator[Tuple[int, int, int]]":
+    '''
+    stream the edges of an edge list file,
+    one "start end weight" per line, lines starting with # are skipped
+
+    Params
+    ----------
+        path str: the edge list file
+
+    Returns
+    ----------
+        Iterator[Tuple[int, int, int]] : (start, end, weight) of each edge
+    '''
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"): continue
+            (i, j, w) = parts[:3]
+            try:
+                w = int(w)
+            except ValueError:
+                w = float(w)
+            yield (int(i), int(j), w)
+
+def _spill_run(
+    edges: "List[Tuple[int, int, int]]",
+    tmpdir: "Optional[str]"
+) -> "str":
+    '''
+    sort a chunk of edges by weight and write it to a temporary file,
+    a type byte ("q" or "d") then fixed size (start, end, weight) records
+    '''
+    edges.sort(key=lambda e: e[2])
+    code = "d" if any(isinstance(w, float) for (_, _, w) in edges) else "q"
+    record = struct.Struct("<ii" + code)
+    (fd, path) = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with os.fdopen(fd, "wb") as f:
+        f.write(code.encode())
+        buf = bytearray()
+        for e in edges:
+            buf += record.pack(*e)
+            if len(buf) >= 1 << 20:
+                f.write(buf)
+                buf.clear()
+        f.write(buf)
+    return path
+
+def _read_run(
+    path: "str",
+    buffer: "int"
+) -> "Iterator[Tuple[int, int, int]]":
+    '''
+    stream the edges of a sorted run, reading about buffer bytes at a time
+    '''
+    with open(path, "rb") as f:
+        record = struct.Struct("<ii" + f.read(1).decode())
+        size = max(1, buffer // record.size) * record.size
+        while True:
+            data = f.read(size)
+            if not data: return
+            yield from record.iter_unpack(data)
+
+def kruskal_external(
+    source: "str | Iterable[Tuple[int, int, int]]",
+    n: "int",
+    chunk: "int"=1 << 20,
+    buffer: "int"=1 << 16,
+    tmpdir: "Optional[str]"=None
+) -> "Tuple[List[Tuple[int, int, int]], int]":
+    '''
+    Kruskal algorithm for edge lists larger than memory
+    edges are read chunk by chunk, each chunk sorted by weight and spilled
+    to a temporary file, then the sorted runs are merged with heapq.merge
+    and fed in order to kruskal_dsu, so only O(n + chunk) stays in memory
+
+    Params
+    ----------
+        source str | Iterable[Tuple[int, int, int]]: path of an edge list
+            file (see read_edges) or (start, end, weight) of every edge
+        n int: number of vertices
+        chunk int: number of edges sorted in memory at once
+        buffer int: bytes read from a run at a time while merging
+        tmpdir Optional[str]: directory of the temporary runs
+
+    Returns
+    ----------
+        Tuple[List[Tuple[int, int, int]], int] : same as kruskal_dsu
+    '''
+    edges = read_edges(source) if isinstance(source, str) else iter(source)
+    runs = []
+    try:
+        while True:
+            batch = [e for (_, e) in zip(range(chunk), edges)]
+            if not batch: break
+            runs.append(_spill_run(batch, tmpdir))
+            del batch
+        merged = heapq.merge(
+            *[_read_run(path, buffer) for path in runs], key=lambda e: e[2]
+        )
+        return kruskal_dsu(merged, n, presorted=True)
+    finally:
+        for path in runs:
+            os.remove(path)
+
+def _cheapest(
+    comp: "np.ndarray",
+    e: "np.ndarray",
+    w: "np.ndarray"
+) -> "Tuple[np.ndarray, np.ndarray]":
+    '''
+    lightest edge for each component, ties broken by edge index
+    so that every component agrees on the same total order
+
+    Params
+    ----------
+        comp np.ndarray: component the edge leaves
+        e np.ndarray: index of the edge
+        w np.ndarray: weight of the edge
+
+    Returns
+    ----------
+        Tuple[np.ndarray, np.ndarray] : components and their lightest edge
+    '''
+    order = np.lexsort((e, w, comp))
+    comp = comp[order]
+    first = np.ones(len(comp), dtype=bool)
+    first[1:] = comp[1:] != comp[:-1]
+    return comp[first], e[order][first]
+
+def _boruvka_task(bounds: "Tuple[int, int]") -> "Tuple[np.ndarray, np.ndarray]":
+    '''
+    lightest outgoing edge of each component among edges [lo, hi)
+    '''
+    (lo, hi) = bounds
+    comp = shared_array("comp")
+    cu = comp[shared_array("u")[lo:hi]]
+    cv = comp[shared_array("v")[lo:hi]]
+    ## edges inside a component are useless
+    out = np.flatnonzero(cu != cv)
+    e = out + lo
+    w = shared_array("w")[lo:hi][out]
+    return _cheapest(
+        np.concatenate((cu[out], cv[out])),
+        np.concatenate((e, e)),
+        np.concatenate((w, w))
+    )
+
+def boruvka(
+    adjMat: "List[List[int]] | CSRGraph",
+    workers: "Optional[int]"=None,
+    chunk: "int"=1 << 18
+) -> "Tuple[List[int], List[int]]":
+    '''
+    Boruvka algorithm
+    every round each component picks its lightest outgoing edge,
+    then all picked edges are added and the components merged,
+    the number of components at least halves so O(log n) rounds,
+    the search for lightest edges is spread over a pool of processes
+    reading the edge arrays from shared memory
+
+    Params
+    ----------
+        adjMat List[List[int]] | CSRGraph: adjacency matrix of the graph
+            or the graph in CSR form
+        workers Optional[int]: number of processes, defaults to the
+            cpu count, 1 runs everything in this process
+        chunk int: number of edges in one task
+
+    Returns
+    ----------
+        Tuple[List[int], List[int]] : two lists, same as prim
+            one contains vertex node for each vertex
+            the other contains the cost from the tree to the vertex
+    '''
+    if np is None:
+        raise ImportError("boruvka requires numpy")
+    graph = as_csr(adjMat)
+    n = len(graph)
+    workers = workers or multiprocessing.cpu_count()
+    ## each undirected edge once
+    (indptr, indices, weights) = graph.to_numpy()
+    rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+    keep = rows < indices
+    with SharedArrays() as shared:
+        u = shared.share("u", rows[keep])
+        v = shared.share("v", indices[keep])
+        w = shared.share("w", weights[keep])
+        comp = shared.share("comp", np.arange(n, dtype=np.int32))
+        shared.start(workers)
+        m = len(u)
+        ds = DisjointSet(n)
+        tree = []
+        tasks = [(lo, min(lo + chunk, m)) for lo in range(0, m, chunk)]
+        while ds.count > 1:
+            found = shared.map(_boruvka_task, tasks)
+            if not any(len(c) for (c, _) in found): break
+            ## combine the lightest edges found by each task
+            c = np.concatenate([c for (c, _) in found])
+            e = np.concatenate([e for (_, e) in found])
+            (_, best) = _cheapest(c, e, w[e])
+            for i in np.unique(best).tolist():
+                if ds.union(int(u[i]), int(v[i])):
+                    tree.append(i)
+            ## contract, every vertex points to its component
+            comp[:] = [ds.find(x) for x in range(n)]
+        tree = np.array(tree, dtype=np.int64)
+        edges = list(zip(u[tree].tolist(), v[tree].tolist(), w[tree].tolist()))
+        ## the blocks can only be closed once no view of them is left
+        del u, v, w, comp
+    return _tree_to_prev(n, edges)
+
+def _tree_to_prev(
+    n: "int",
+    edges: "List[Tuple[int, int, int]]"
+) -> "Tuple[List[int], List[int]]":
+    '''
+    turn the edges of a spanning tree into the prev and cost lists of prim,
+    rooted at vertex 0, vertices not connected to it have no prev
+    '''
+    prev = [None] * n
+    cost = [INF] * n
+    if not n: return (prev, cost)
+    adjList = [[] for _ in range(n)]
+    for (i, j, w) in edges:
+        adjList[i].append((j, w))
+        adjList[j].append((i, w))
+    cost[0] = 0
+    visited = [False] * n
+    visited[0] = True
+    q = deque([0])
+    while q:
+        idx = q.popleft()
+        for (i, w) in adjList[idx]:
+            if not visited[i]:
+                visited[i] = True
+                prev[i] = idx
+                cost[i] = w
+                q.append(i)
+    return (prev, cost)
+
+def bench_mst(
+    sizes: "List[int]",
+    degrees: "List[int]",
+    seed: "int"=0
+) -> "List[Tuple[str, int, int, float]]":
+    '''
+    compare prim, prim_heap, kruskal, kruskal_dsu and boruvka
+    on random connected graphs
+
+    Params
+    ----------
+        sizes List[int]: numbers of vertices to try
+        degrees List[int]: average numbers of edges per vertex to try
+        seed int: seed of the random graphs
+
+    Returns
+    ----------
+        List[Tuple[str, int, int, float]] : (algorithm, n, degree, seconds)
+            for each run
+    '''
+    rng = random.Random(seed)
+    algos = [
+        ("prim", prim),
+        ("prim_heap", prim_heap),
+        ("kruskal", kruskal),
+        ("kruskal_dsu", kruskal_dsu),
+        ("boruvka", boruvka)
+    ]
+    rslt = []
+    for n in sizes:
+        for degree in degrees:
+            ## a random tree keeps the graph connected
+            edges = [(i, rng.randrange(i), rng.randint(1, 100)) for i in range(1, n)]
+            for _ in range(max(0, n * degree // 2 - (n - 1))):
+                (i, j) = (rng.randrange(n), rng.randrange(n))
+                if i != j: edges.append((i, j, rng.randint(1, 100)))
+            graph = CSRGraph.from_edges(n, edges, directed=False)
+            for (name, algo) in algos:
+                if name == "boruvka" and np is None: continue
+                start = time.perf_counter()
+                algo(graph)
+                rslt.append((name, n, degree, time.perf_counter() - start))
+    for (name, n, degree, dur) in rslt:
+        print(f"{name}\tn={n}\tdegree={degree}\t{dur:.4f}")
+    return rslt
+
 
 def main():
     test_case_1 = [
@@ -138,6 +608,14 @@ def main():
     print(kruskal(test_case_1))
     print(kruskal(test_case_2))
     print(kruskal(test_case_3))
+    print(prim(CSRGraph.from_adjmat(test_case_3)))
+    print(prim_heap(test_case_3))
+    print(kruskal_dsu(test_case_3))
+    print(kruskal_dsu(test_case_3, use_heap=True))
+    print(kruskal(CSRGraph.from_adjmat(test_case_3)))
+    if np is not None:
+        print(boruvka(test_case_3, workers=1))
+    bench_mst([1000, 4000], [4, 32])
 
 if __name__ == '__main__':
     main()
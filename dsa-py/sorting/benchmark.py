@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+
+'''
+benchmark and regression harness for the sorting algorithms
+
+run as a module of the package, from the directory above dsa-py
+
+    python -m dsa-py.sorting.benchmark run -o new.json
+    python -m dsa-py.sorting.benchmark diff old.json new.json --threshold 0.1
+'''
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .bubblesort import bubbleSort
+from .mergesort import mergeSort, mergeSort2, mergeSortBottomUp
+from .quicksort import (
+    quickSort, quickSortHelper1, quickSortHelper2, quickSortHelper3
+)
+from .parallelsort import parallel_sort
+from .radixsort import np, countingSort, radixSort
+
+## name, sort function, largest n worth running,
+## works on any comparable (so comparisons can be counted),
+## writes only into the list it sorts (so writes can be counted)
+ALGORITHMS: "List[Tuple[str, Callable[[List[int]], Any], int, bool, bool]]" = [
+    ("bubbleSort", bubbleSort, 2000, True, True),
+    ("mergeSort", mergeSort, 10**7, True, False),
+    ("mergeSort2", mergeSort2, 10**7, True, False),
+    ("mergeSortBottomUp", mergeSortBottomUp, 10**7, True, False),
+    ("quickSort", quickSort, 10**7, True, True),
+    ("quickSortHelper1", lambda l: quickSortHelper1(l, 0, len(l)), 10**7, True, True),
+    ("quickSortHelper2", lambda l: quickSortHelper2(l, 0, len(l)), 10**7, True, True),
+    ("quickSortHelper3", lambda l: quickSortHelper3(l, 0, len(l)), 10**7, True, True),
+    ("introSort", lambda l: quickSort(l, intro=True), 10**7, True, True),
+    ("parallelSample", lambda l: parallel_sort(l, method="sample"), 10**8, False, False),
+    ("parallelMerge", lambda l: parallel_sort(l, method="merge"), 10**8, False, False),
+]
+if np is not None:
+    ALGORITHMS.append(("countingSort", countingSort, 10**8, False, False))
+    ALGORITHMS.append(("radixSort", radixSort, 10**8, False, False))
+
+def _organPipe(n: "int", rng: "random.Random") -> "List[int]":
+    half = list(range(n // 2))
+    return half + list(range(n - n // 2 - 1, -1, -1))
+
+def _sawtooth(n: "int", rng: "random.Random") -> "List[int]":
+    tooth = max(1, int(n ** 0.5))
+    return [i % tooth for i in range(n)]
+
+## input distributions
+DISTRIBUTIONS: "Dict[str, Callable[[int, random.Random], List[int]]]" = {
+    "random": lambda n, rng: [rng.randrange(n * 10 + 1) for _ in range(n)],
+    "sorted": lambda n, rng: list(range(n)),
+    "reversed": lambda n, rng: list(range(n, 0, -1)),
+    "few_unique": lambda n, rng: [rng.randrange(8) for _ in range(n)],
+    "organ_pipe": _organPipe,
+    "sawtooth": _sawtooth,
+}
+
+class _Counter():
+    comparisons = 0
+    writes = 0
+
+class _Counted(int):
+    '''
+    int that counts every comparison made with it
+    '''
+    __slots__ = ()
+
+    def __lt__(self, other: "int") -> "bool":
+        _Counter.comparisons += 1
+        return int.__lt__(self, other)
+
+    def __le__(self, other: "int") -> "bool":
+        _Counter.comparisons += 1
+        return int.__le__(self, other)
+
+    def __gt__(self, other: "int") -> "bool":
+        _Counter.comparisons += 1
+        return int.__gt__(self, other)
+
+    def __ge__(self, other: "int") -> "bool":
+        _Counter.comparisons += 1
+        return int.__ge__(self, other)
+
+class _CountingList(list):
+    '''
+    list that counts writes to it, a swap is two writes
+    and a slice assignment one write per element
+    '''
+    def __setitem__(self, idx: "Any", value: "Any") -> "None":
+        if isinstance(idx, slice):
+            value = list(value)
+            _Counter.writes += len(value)
+        else:
+            _Counter.writes += 1
+        list.__setitem__(self, idx, value)
+
+def measure(
+    sort: "Callable[[List[int]], Any]",
+    data: "List[int]",
+    repeat: "int"=3,
+    warmup: "int"=1,
+    count: "bool"=True,
+    count_writes: "bool"=True
+) -> "Dict[str, Any]":
+    '''
+    time one sort on one input, every run sorts a fresh copy
+
+    Params
+    ----------
+        sort Callable[[List[int]], Any]: the sort function
+        data List[int]: the input, never modified
+        repeat int: number of timed runs
+        warmup int: number of untimed runs before them
+        count bool: also count comparisons and writes
+            in a separate run, with instrumented elements
+        count_writes bool: the sort only writes into the list it is
+            given, otherwise writes are reported as None, not 0
+
+    Returns
+    ----------
+        Dict[str, Any]: median_ns, min_ns, peak_bytes,
+            comparisons and writes (None if not counted)
+    '''
+    for _ in range(warmup):
+        sort(list(data))
+    times = []
+    for _ in range(repeat):
+        lst = list(data)
+        start = time.perf_counter_ns()
+        sort(lst)
+        times.append(time.perf_counter_ns() - start)
+    ## separate runs so tracing and counting do not distort the timing
+    lst = list(data)
+    tracemalloc.start()
+    sort(lst)
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    comparisons = writes = None
+    if count:
+        _Counter.comparisons = _Counter.writes = 0
+        sort(_CountingList(_Counted(x) for x in data))
+        comparisons = _Counter.comparisons
+        if count_writes: writes = _Counter.writes
+    return {
+        "median_ns": int(statistics.median(times)),
+        "min_ns": min(times),
+        "peak_bytes": peak,
+        "comparisons": comparisons,
+        "writes": writes,
+    }
+
+def run(
+    sizes: "List[int]",
+    algorithms: "Optional[List[str]]"=None,
+    distributions: "Optional[List[str]]"=None,
+    repeat: "int"=3,
+    warmup: "int"=1,
+    seed: "int"=0
+) -> "Dict[str, Any]":
+    '''
+    benchmark every algorithm on every distribution and size
+
+    Params
+    ----------
+        sizes List[int]: input sizes
+        algorithms Optional[List[str]]: names to run, all by default
+        distributions Optional[List[str]]: names to run, all by default
+        repeat int: number of timed runs per case
+        warmup int: number of untimed runs per case
+        seed int: seed of the random inputs
+
+    Returns
+    ----------
+        Dict[str, Any]: "meta" about the machine and "results",
+            one record per (algorithm, distribution, n)
+    '''
+    results = []
+    for n in sizes:
+        for dist in distributions or DISTRIBUTIONS:
+            data = DISTRIBUTIONS[dist](n, random.Random(seed))
+            for (name, sort, max_n, generic, in_place) in ALGORITHMS:
+                if algorithms and name not in algorithms: continue
+                record = {"algorithm": name, "distribution": dist, "n": n}
+                if n > max_n:
+                    record["status"] = "skipped"
+                else:
+                    try:
+                        record.update(measure(
+                            sort, data, repeat, warmup, generic, in_place
+                        ))
+                        record["status"] = "ok"
+                    except RecursionError:
+                        record["status"] = "recursion"
+                results.append(record)
+                print(_format(record), flush=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+def diff(
+    old: "Dict[str, Any]",
+    new: "Dict[str, Any]",
+    threshold: "float"=0.1
+) -> "List[Dict[str, Any]]":
+    '''
+    compare two benchmark runs
+
+    Params
+    ----------
+        old Dict[str, Any]: the baseline run
+        new Dict[str, Any]: the run to check
+        threshold float: relative slowdown of the median time
+            that counts as a regression
+
+    Returns
+    ----------
+        List[Dict[str, Any]]: every case present in both runs
+            with old_ns, new_ns, ratio and regression
+    '''
+    key = lambda r: (r["algorithm"], r["distribution"], r["n"])
+    before = {key(r): r for r in old["results"] if r["status"] == "ok"}
+    rows = []
+    for r in new["results"]:
+        if r["status"] != "ok" or key(r) not in before: continue
+        old_ns = before[key(r)]["median_ns"]
+        ratio = r["median_ns"] / old_ns if old_ns else float("inf")
+        rows.append({
+            "algorithm": r["algorithm"],
+            "distribution": r["distribution"],
+            "n": r["n"],
+            "old_ns": old_ns,
+            "new_ns": r["median_ns"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+def _orNa(value: "Optional[int]") -> "str":
+    return "n/a" if value is None else str(value)
+
+def _format(record: "Dict[str, Any]") -> "str":
+    head = f"{record['algorithm']:<18}{record['distribution']:<12}{record['n']:>10}"
+    if record["status"] != "ok":
+        return f"{head}  {record['status']}"
+    return (
+        f"{head}{record['median_ns'] / 1e6:>12.3f} ms"
+        + f"{record['peak_bytes']:>12} B"
+        + f"{_orNa(record['comparisons']):>12} cmp"
+        + f"{_orNa(record['writes']):>12} wr"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="run the benchmark")
+    p.add_argument("-o", "--output", default="bench_output.json")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    p.add_argument("--algorithms", nargs="+")
+    p.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--warmup", type=int, default=1)
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("diff", help="compare two runs")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+    if args.command == "run":
+        rslt = run(
+            args.sizes, args.algorithms, args.distributions,
+            args.repeat, args.warmup, args.seed
+        )
+        with open(args.output, "w") as f:
+            json.dump(rslt, f, indent=2)
+        return 0
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows = diff(old, new, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['algorithm']:<18}{row['distribution']:<12}{row['n']:>10}"
+            + f"{row['ratio']:>8.2f}x  {flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
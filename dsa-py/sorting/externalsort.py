@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Any, Callable, Iterator, List, Optional
+
+def _readChunks(
+    path: "str",
+    memory_limit: "int",
+    buffer: "int"
+) -> "Iterator[List[bytes]]":
+    '''
+    read the lines of a file in chunks of about memory_limit bytes,
+    every line ends with a newline, even the last one
+    '''
+    with open(path, "rb", buffering=buffer) as f:
+        chunk = []
+        size = 0
+        for line in f:
+            if not line.endswith(b"\n"): line += b"\n"
+            chunk.append(line)
+            size += len(line)
+            if size >= memory_limit:
+                yield chunk
+                chunk = []
+                size = 0
+        if chunk: yield chunk
+
+def _writeRun(
+    lines: "List[bytes]",
+    key: "Optional[Callable[[bytes], Any]]",
+    tmpdir: "Optional[str]",
+    buffer: "int"
+) -> "str":
+    '''
+    sort a chunk of lines in memory and write it to a temporary file
+
+    Returns
+    ----------
+        str: path of the sorted run
+    '''
+    lines.sort(key=key)
+    (fd, path) = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with open(fd, "wb", buffering=buffer) as f:
+        f.writelines(lines)
+    return path
+
+def _mergeRuns(
+    runs: "List[str]",
+    output_path: "str",
+    key: "Optional[Callable[[bytes], Any]]",
+    buffer: "int"
+) -> "None":
+    '''
+    k-way merge sorted runs into one file through a heap,
+    each run is read through a buffer of about buffer bytes
+    '''
+    files = [open(path, "rb", buffering=buffer) for path in runs]
+    try:
+        with open(output_path, "wb", buffering=buffer) as out:
+            out.writelines(heapq.merge(*files, key=key))
+    finally:
+        for f in files:
+            f.close()
+
+def external_sort(
+    input_path: "str",
+    output_path: "str",
+    key: "Optional[Callable[[bytes], Any]]"=None,
+    memory_limit: "int"=1 << 26,
+    workers: "int"=1,
+    fan_in: "int"=64,
+    buffer: "int"=1 << 16,
+    tmpdir: "Optional[str]"=None
+) -> "None":
+    '''
+    sort the lines of a file larger than memory
+        the input is read in chunks, each chunk is sorted in memory
+            and written to a temporary file as a sorted run
+        runs are merged fan_in at a time through a heap
+            until one run is left, which becomes the output
+    the sort is stable and compares lines as bytes, newline included
+
+    Params
+    ----------
+        input_path str: file to sort
+        output_path str: file to write the sorted lines to
+        key Optional[Callable[[bytes], Any]]: compare key(line)
+            instead of the line, must be picklable when workers > 1
+        memory_limit int: bytes of lines in one chunk,
+            with workers > 1 up to workers chunks are in memory at once
+        workers int: number of processes sorting chunks,
+            1 sorts them in this process
+        fan_in int: most runs merged at once
+        buffer int: bytes buffered per file while reading and writing
+        tmpdir Optional[str]: where to make the directory of the
+            temporary runs
+
+    Returns
+    ----------
+        None: the sorted lines are written to output_path
+    '''
+    fan_in = max(2, fan_in)
+    ## every run lives in one private directory, removed with all it
+    ## holds however the sort ends, a failed pass leaves nothing behind
+    with tempfile.TemporaryDirectory(prefix="extsort-", dir=tmpdir) as work:
+        runs = []
+        chunks = _readChunks(input_path, memory_limit, buffer)
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                ## at most one chunk per worker in flight
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.apply_async(
+                        _writeRun, (chunk, key, work, buffer)
+                    ))
+                    del chunk
+                    if len(pending) >= workers:
+                        runs.append(pending.popleft().get())
+                while pending:
+                    runs.append(pending.popleft().get())
+        else:
+            for chunk in chunks:
+                runs.append(_writeRun(chunk, key, work, buffer))
+        ## merge passes until few enough runs are left
+        while len(runs) > fan_in:
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                group = runs[i:i + fan_in]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                (fd, path) = tempfile.mkstemp(suffix=".run", dir=work)
+                os.close(fd)
+                merged.append(path)
+                _mergeRuns(group, path, key, buffer)
+                for run in group:
+                    os.remove(run)
+            runs = merged
+        try:
+            _mergeRuns(runs, output_path, key, buffer)
+        except BaseException:
+            ## no half written output
+            if os.path.exists(output_path): os.remove(output_path)
+            raise
+
+if __name__ == "__main__":
+    import random
+    (fd, src) = tempfile.mkstemp(suffix=".txt")
+    with open(fd, "w") as f:
+        for _ in range(200000):
+            f.write(f"{random.randint(0, 10**9)}\n")
+    dst = src + ".sorted"
+    start = time.time()
+    external_sort(src, dst, key=int, memory_limit=1 << 18, fan_in=8)
+    end = time.time()
+    print(f"external sort: {end - start:.4f}")
+    with open(dst) as f:
+        nums = [int(line) for line in f]
+    print(nums == sorted(nums))
+    os.remove(src)
+    os.remove(dst)
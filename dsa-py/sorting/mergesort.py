@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import bisect
 import time
-from typing import List
+from typing import Any, Callable, List, Optional
 
 def mergeSort(lst: "List[int]") -> "List[int]":
     n = len(lst)
@@ -39,8 +40,8 @@ def mergeSort2(lst: "List[int]") -> "List[int]":
     mid = n // 2
     l = lst[:mid]
     r = lst[mid:]
-    l = mergeSort(l)
-    r = mergeSort(r)
+    l = mergeSort2(l)
+    r = mergeSort2(r)
     ans = []
     j = k = 0
     llen = len(l)
@@ -62,6 +63,176 @@ def mergeSort2(lst: "List[int]") -> "List[int]":
             j += 1
     return ans
 
+def mergeSortBottomUp(
+    lst: "List[Any]",
+    key: "Optional[Callable[[Any], Any]]"=None,
+    reverse: "bool"=False
+) -> "None":
+    '''
+    stable merge sort without recursion
+        the list is cut into natural runs, already ascending
+            or strictly descending (reversed) stretches,
+            short runs are extended to minrun by binary insertion sort
+        neighboring runs are merged pass by pass, back and forth
+            between the list and one auxiliary buffer,
+            besides that buffer only short temporary slices are made
+            to reverse runs, shift inside a run and copy merge leftovers
+    so sorted or partially sorted input is close to O(n)
+
+    Params
+    ----------
+        lst List[Any]: the list to be sorted
+        key Optional[Callable[[Any], Any]]: compare key(x) instead of x,
+            called once per element
+        reverse bool: sort in descending order, still stable
+
+    Returns
+    ----------
+        None: the list is sorted in place
+    '''
+    n = len(lst)
+    if n < 2: return
+    ## keys are sorted, items follow them when there is a key
+    keys = [key(x) for x in lst] if key else lst
+    items = lst if key else None
+    bounds = _findRuns(keys, items, reverse, _minRun(n))
+    ## ping pong between the list and the buffer
+    src, dst = keys, [None] * n
+    isrc, idst = items, ([None] * n if key else None)
+    while len(bounds) > 2:
+        merged = [0]
+        for r in range(0, len(bounds) - 1, 2):
+            lo = bounds[r]
+            if r + 2 < len(bounds):
+                (mid, hi) = (bounds[r + 1], bounds[r + 2])
+                _mergeRuns(src, dst, isrc, idst, lo, mid, hi, reverse)
+            else:
+                ## odd run out, just carried over
+                hi = bounds[r + 1]
+                dst[lo:hi] = src[lo:hi]
+                if key: idst[lo:hi] = isrc[lo:hi]
+            merged.append(hi)
+        bounds = merged
+        (src, dst) = (dst, src)
+        (isrc, idst) = (idst, isrc)
+    if key:
+        if isrc is not lst: lst[:] = isrc
+    elif src is not lst:
+        lst[:] = src
+
+def _minRun(n: "int") -> "int":
+    '''
+    minimum run length, same as timsort, between 32 and 64
+    so that n / minrun is a power of 2 or slightly less
+    '''
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+def _findRuns(
+    keys: "List[Any]",
+    items: "Optional[List[Any]]",
+    reverse: "bool",
+    minrun: "int"
+) -> "List[int]":
+    '''
+    cut keys into sorted runs of at least minrun elements (except the last)
+    strictly descending runs are reversed, which keeps the sort stable
+
+    Returns
+    ----------
+        List[int]: boundaries of the runs, starting with 0 ending with n
+    '''
+    n = len(keys)
+    bounds = [0]
+    i = 0
+    while i < n:
+        j = i + 1
+        if j < n:
+            ## strictly "descending" in the requested order
+            if (keys[j] > keys[j - 1]) if reverse else (keys[j] < keys[j - 1]):
+                j += 1
+                while j < n and (
+                    (keys[j] > keys[j - 1]) if reverse
+                    else (keys[j] < keys[j - 1])
+                ):
+                    j += 1
+                keys[i:j] = keys[i:j][::-1]
+                if items is not None: items[i:j] = items[i:j][::-1]
+            else:
+                while j < n and not (
+                    (keys[j] > keys[j - 1]) if reverse
+                    else (keys[j] < keys[j - 1])
+                ):
+                    j += 1
+        ## extend a short run with binary insertion sort,
+        ## log(minrun) comparisons per element, one slice shift each
+        end = min(n, i + minrun)
+        while j < end:
+            x = keys[j]
+            if reverse:
+                ## after every key >= x, so equal keys keep their order
+                (lo, hi) = (i, j)
+                while lo < hi:
+                    m = (lo + hi) // 2
+                    if x > keys[m]:
+                        hi = m
+                    else:
+                        lo = m + 1
+            else:
+                lo = bisect.bisect_right(keys, x, i, j)
+            if lo < j:
+                keys[lo + 1:j + 1] = keys[lo:j]
+                keys[lo] = x
+                if items is not None:
+                    item = items[j]
+                    items[lo + 1:j + 1] = items[lo:j]
+                    items[lo] = item
+            j += 1
+        bounds.append(j)
+        i = j
+    return bounds
+
+def _mergeRuns(
+    src: "List[Any]",
+    dst: "List[Any]",
+    isrc: "Optional[List[Any]]",
+    idst: "Optional[List[Any]]",
+    lo: "int",
+    mid: "int",
+    hi: "int",
+    reverse: "bool"
+) -> "None":
+    '''
+    merge src[lo:mid] and src[mid:hi] into dst[lo:hi],
+    on ties the left run goes first, items (if any) follow their keys
+    '''
+    ## already in order, nothing to interleave
+    if not ((src[mid] > src[mid - 1]) if reverse else (src[mid] < src[mid - 1])):
+        dst[lo:hi] = src[lo:hi]
+        if isrc is not None: idst[lo:hi] = isrc[lo:hi]
+        return
+    i, j, k = lo, mid, lo
+    while i < mid and j < hi:
+        if (src[j] > src[i]) if reverse else (src[j] < src[i]):
+            dst[k] = src[j]
+            if isrc is not None: idst[k] = isrc[j]
+            j += 1
+        else:
+            dst[k] = src[i]
+            if isrc is not None: idst[k] = isrc[i]
+            i += 1
+        k += 1
+    ## one side is used up, copy the rest of the other
+    if i < mid:
+        dst[k:hi] = src[i:mid]
+        if isrc is not None: idst[k:hi] = isrc[i:mid]
+    else:
+        dst[k:hi] = src[j:hi]
+        if isrc is not None: idst[k:hi] = isrc[j:hi]
+
 if __name__ == "__main__":
     test1 = [2, 5, 1, 3]
     print(mergeSort(test1))
@@ -88,3 +259,8 @@ if __name__ == "__main__":
         mergeSort2(test)
     end = time.time()
     print(f"Append: {end-start:.4f}")
+    start = time.time()
+    for i in range(500000):
+        mergeSortBottomUp(list(test))
+    end = time.time()
+    print(f"Bottom up: {end-start:.4f}")
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import time
+from array import array
+from typing import Dict, List, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError: ## parallel_sort falls back to sorted without numpy
+    np = None
+
+from ..graph.sharedarrays import SharedArrays, shared_array
+
+def mergeSorted(a: "np.ndarray", b: "np.ndarray", out: "np.ndarray") -> "None":
+    '''
+    merge two sorted arrays into out, elements of a go first on ties,
+    every element of b finds its place with a binary search in a
+
+    Params
+    ----------
+        a np.ndarray: sorted array
+        b np.ndarray: sorted array
+        out np.ndarray: array of len(a) + len(b) to write to
+    '''
+    pos = np.searchsorted(a, b, side="right") + np.arange(len(b))
+    rest = np.ones(len(out), dtype=bool)
+    rest[pos] = False
+    out[pos] = b
+    out[rest] = a
+
+def _task(task: "Tuple") -> "None":
+    '''
+    run one parallel_sort task on the shared buffers
+
+    Params
+    ----------
+        task Tuple: one of
+            ("sort", buf, lo, hi) sort buf[lo:hi] in place
+            ("merge", src, dst, lo, mid, hi) merge the sorted
+                src[lo:mid] and src[mid:hi] into dst[lo:hi]
+            ("bucket", src, dst, lo, pieces) copy the (start, end)
+                pieces of src one after another into dst from lo on,
+                then sort them there
+    '''
+    kind = task[0]
+    if kind == "sort":
+        (_, buf, lo, hi) = task
+        shared_array(buf)[lo:hi].sort()
+    elif kind == "merge":
+        (_, src, dst, lo, mid, hi) = task
+        src = shared_array(src)
+        mergeSorted(src[lo:mid], src[mid:hi], shared_array(dst)[lo:hi])
+    else:
+        (_, src, dst, lo, pieces) = task
+        (src, dst) = (shared_array(src), shared_array(dst))
+        hi = lo
+        for (st, end) in pieces:
+            dst[hi:hi + end - st] = src[st:end]
+            hi += end - st
+        dst[lo:hi].sort()
+
+def parallel_sort(
+    data: "Union[Sequence[int], array, np.ndarray]",
+    workers: "int"=None,
+    method: "str"="sample",
+    threshold: "int"=1 << 16
+) -> "Tuple[Union[np.ndarray, List[int]], Dict[str, float]]":
+    '''
+    sort numbers on several cores
+    the data is copied once into shared memory, no list is pickled,
+    each worker sorts one contiguous partition in place, then
+        "sample": regular samples of the sorted partitions give
+            workers - 1 splitters, worker j gathers every value between
+            splitter j - 1 and j from all partitions into its own slice
+            of the output and sorts it (parallel sample sort)
+        "merge": neighboring partitions are merged pairwise in rounds,
+            a k-way merge done in log2(k) parallel rounds
+
+    Params
+    ----------
+        data Sequence[int] | array | np.ndarray: numbers to sort
+        workers int: number of processes, defaults to the cpu count
+        method str: "sample" or "merge"
+        threshold int: below this many numbers just sort serially
+
+    Returns
+    ----------
+        Tuple[np.ndarray | List[int], Dict[str, float]] : sorted copy
+            of the data, a list only when numpy is missing,
+            and seconds spent in each phase
+    '''
+    total = time.perf_counter()
+    workers = workers or multiprocessing.cpu_count()
+    if np is None:
+        ans = sorted(data)
+        return (ans, {"serial": time.perf_counter() - total})
+    src = np.asarray(data)
+    n = len(src)
+    ## no empty partitions
+    workers = min(workers, n)
+    if n < threshold or workers < 2:
+        ans = np.sort(src)
+        return (ans, {"serial": time.perf_counter() - total})
+    if method not in ("sample", "merge"):
+        raise ValueError(f"unknown method {method}")
+    timings = {}
+    with SharedArrays() as shared:
+        bufs = {
+            "a": shared.share("a", src),
+            "b": shared.create("b", (n,), src.dtype)
+        }
+        shared.start(workers)
+        timings["setup"] = time.perf_counter() - total
+        ## phase 1: each worker sorts one partition
+        start = time.perf_counter()
+        bounds = [n * p // workers for p in range(workers + 1)]
+        shared.map(_task, [
+            ("sort", "a", bounds[p], bounds[p + 1]) for p in range(workers)
+        ])
+        timings["local_sort"] = time.perf_counter() - start
+        a = bufs["a"]
+        if method == "sample":
+            ## phase 2: splitters from regular samples
+            start = time.perf_counter()
+            samples = np.sort(np.concatenate([
+                a[bounds[p]:bounds[p + 1]][
+                    np.linspace(
+                        0, bounds[p + 1] - bounds[p] - 1, workers, dtype=np.int64
+                    )
+                ] for p in range(workers)
+            ]))
+            splitters = samples[workers::workers][:workers - 1]
+            ## where each splitter falls in each partition
+            cuts = [
+                [bounds[p]] + (
+                    np.searchsorted(a[bounds[p]:bounds[p + 1]], splitters)
+                    + bounds[p]
+                ).tolist() + [bounds[p + 1]]
+                for p in range(workers)
+            ]
+            tasks = []
+            lo = 0
+            for j in range(workers):
+                pieces = [(cuts[p][j], cuts[p][j + 1]) for p in range(workers)]
+                tasks.append(("bucket", "a", "b", lo, pieces))
+                lo += sum(end - st for (st, end) in pieces)
+            timings["split"] = time.perf_counter() - start
+            ## phase 3: each worker sorts one bucket into the output
+            start = time.perf_counter()
+            shared.map(_task, tasks)
+            timings["bucket_sort"] = time.perf_counter() - start
+            ans = bufs["b"].copy()
+        else:
+            ## phase 2: pairwise merge rounds, back and forth between buffers
+            start = time.perf_counter()
+            (src_key, dst_key) = ("a", "b")
+            while len(bounds) > 2:
+                tasks = []
+                merged = [0]
+                for r in range(0, len(bounds) - 1, 2):
+                    if r + 2 < len(bounds):
+                        tasks.append((
+                            "merge", src_key, dst_key,
+                            bounds[r], bounds[r + 1], bounds[r + 2]
+                        ))
+                        merged.append(bounds[r + 2])
+                    else:
+                        ## odd partition out, carried over
+                        (lo, hi) = (bounds[r], bounds[r + 1])
+                        bufs[dst_key][lo:hi] = bufs[src_key][lo:hi]
+                        merged.append(hi)
+                shared.map(_task, tasks)
+                bounds = merged
+                (src_key, dst_key) = (dst_key, src_key)
+            timings["merge"] = time.perf_counter() - start
+            ans = bufs[src_key].copy()
+        ## the blocks can only be closed once no view of them is left
+        del bufs, a
+    timings["total"] = time.perf_counter() - total
+    return (ans, timings)
+
+
+if __name__ == "__main__":
+    test1 = [5, 3, 9, 1, 3]
+    print(parallel_sort(test1))
+    if np is not None:
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 10**12, 10**7)
+        for method in ["sample", "merge"]:
+            for workers in [1, 2, 4, 8]:
+                (_, timings) = parallel_sort(data, workers, method)
+                print(method, workers, {
+                    k: round(v, 4) for (k, v) in timings.items()
+                })
@@ -1,22 +1,68 @@
 # -*- coding: utf-8 -*-
 
 # import time
-from typing import List
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+import heapq
 import random
 
-def quickSort(lst: "List[int]") -> "None":
+## ranges this short are finished by insertion sort
+INSERTION_CUTOFF: "int" = 16
+## ranges this long take the ninther as pivot
+NINTHER_CUTOFF: "int" = 128
+
+def quickSort(lst: "List[int]", intro: "bool"=False) -> "None":
     '''
     sort a list of numbers using quick sort
 
     Params
     ----------
         lst List[int]: the list to be sorted
+        intro bool: flag for use introsort,
+            never O(n^2) and never deeper than the recursion limit
 
     Returns
     ----------
         None: the list is sorted in place
     '''
-    quickSortHelper3(lst, 0, len(lst))
+    if intro:
+        introSortHelper(lst, 0, len(lst))
+    else:
+        quickSortHelper3(lst, 0, len(lst))
+
+def partition(lst: "List[int]", start: "int", end: "int", p: "int") -> "int":
+    '''
+    partition lst[start:end] around the element at index p
+
+    Params
+    ----------
+        lst List[int]: the list part of which to be partitioned
+        start int: the starting index of the subarray
+        end int: the ending index of the subarray
+        p int: index of the pivot
+
+    Returns
+    ----------
+        int: final index r of the pivot, afterwards
+            lst[start:r] <= lst[r] < lst[r + 1:end]
+    '''
+    ## move pivot to the start
+    lst[p], lst[start] = lst[start], lst[p]
+    r = end - 1
+    l = start + 1
+    while True:
+        while l <= r and lst[l] <= lst[start]:
+            l += 1
+        while r >= l and lst[r] > lst[start]:
+            r -= 1
+        ## two numbers found
+        ## if l and r not met yet, swap
+        if l < r:
+            lst[l], lst[r] = lst[r], lst[l]
+        else:
+            ## if met, end loop, put pivot to r
+            break
+    lst[r], lst[start] = lst[start], lst[r]
+    return r
 
 def quickSortHelper1(lst: "List[int]", start: "int", end: "int") -> "None":
     '''
@@ -74,21 +120,7 @@ def quickSortHelper2(lst: "List[int]", start: "int", end: "int") -> "None":
     r = end - 1
     if start < r:
         p = (end - start) // 2 + start
-        lst[p], lst[start] = lst[start], lst[p]
-        l = start + 1
-        while True:
-            while l <= r and lst[l] <= lst[start]:
-                l += 1
-            while r >= l and lst[r] > lst[start]:
-                r -= 1
-            ## two numbers found
-            ## if l and r not met yet, swap
-            if l < r:
-                lst[l], lst[r] = lst[r], lst[l]
-            else:
-                ## if met, end loop, put pivot to r
-                break
-        lst[r], lst[start] = lst[start], lst[r]
+        r = partition(lst, start, end, p)
         ## sort two subarray
         quickSortHelper2(lst, start, r)
         quickSortHelper2(lst, r + 1, end)
@@ -112,25 +144,415 @@ def quickSortHelper3(lst: "List[int]", start: "int", end: "int") -> "None":
     r = end - 1
     if start < r:
         p = random.randint(start, r)
-        lst[p], lst[start] = lst[start], lst[p]
-        l = start + 1
-        while True:
-            while l <= r and lst[l] <= lst[start]:
-                l += 1
-            while r >= l and lst[r] > lst[start]:
-                r -= 1
-            ## two numbers found
-            ## if l and r not met yet, swap
-            if l < r:
-                lst[l], lst[r] = lst[r], lst[l]
-            else:
-                ## if met, end loop, put pivot to r
-                break
-        lst[r], lst[start] = lst[start], lst[r]
+        r = partition(lst, start, end, p)
         ## sort two subarray
         quickSortHelper3(lst, start, r)
         quickSortHelper3(lst, r + 1, end)
 
+def introSortHelper(lst: "List[int]", start: "int", end: "int") -> "None":
+    '''
+    introsort, quick sort that cannot go wrong
+        pivot is the median of three, or the ninther for long ranges
+        three way partition, elements equal to the pivot are done
+        ranges shorter than INSERTION_CUTOFF go to insertion sort
+        after 2 * log2(n) levels of bad pivots switch to heap sort
+    ranges waiting to be sorted are kept on an explicit stack,
+    always the shorter side is done first so the stack stays O(log n)
+
+    Params
+    ----------
+        lst List[int]: the list part of which to be sorted
+        start int: the starting index of the subarray be sorted
+        end int: the ending index of the subarray to be sorted
+
+    Returns
+    ----------
+        None: the list is sorted in place
+    '''
+    if end - start < 2: return
+    stack = [(start, end, 2 * (end - start).bit_length())]
+    while stack:
+        (lo, hi, depth) = stack.pop()
+        while hi - lo > INSERTION_CUTOFF:
+            if depth == 0:
+                ## too many bad pivots
+                heapSortRange(lst, lo, hi)
+                lo = hi
+                break
+            depth -= 1
+            (lt, gt) = partition3(lst, lo, hi, choosePivot(lst, lo, hi))
+            ## [lt, gt) holds the pivot, keep the longer side for later
+            if lt - lo < hi - gt:
+                stack.append((gt, hi, depth))
+                hi = lt
+            else:
+                stack.append((lo, lt, depth))
+                lo = gt
+        insertionSortRange(lst, lo, hi)
+
+def choosePivot(lst: "List[int]", start: "int", end: "int") -> "int":
+    '''
+    pick a pivot value, median of the first, middle and last elements,
+    or for long ranges the median of three such medians (ninther)
+
+    Params
+    ----------
+        lst List[int]: the list
+        start int: the starting index of the subarray
+        end int: the ending index of the subarray
+
+    Returns
+    ----------
+        int: the pivot value
+    '''
+    n = end - start
+    mid = start + n // 2
+    if n < NINTHER_CUTOFF:
+        return median3(lst[start], lst[mid], lst[end - 1])
+    step = n // 8
+    return median3(
+        median3(lst[start], lst[start + step], lst[start + 2 * step]),
+        median3(lst[mid - step], lst[mid], lst[mid + step]),
+        median3(lst[end - 1 - 2 * step], lst[end - 1 - step], lst[end - 1])
+    )
+
+def median3(a: "int", b: "int", c: "int") -> "int":
+    '''
+    median of three values
+    '''
+    if a < b:
+        if b < c: return b
+        return c if a < c else a
+    if a < c: return a
+    return c if b < c else b
+
+def partition3(
+    lst: "List[int]",
+    start: "int",
+    end: "int",
+    pivot: "int"
+) -> "Tuple[int, int]":
+    '''
+    three way (dutch national flag) partition around a pivot value
+
+    Params
+    ----------
+        lst List[int]: the list part of which to be partitioned
+        start int: the starting index of the subarray
+        end int: the ending index of the subarray
+        pivot int: the pivot value
+
+    Returns
+    ----------
+        Tuple[int, int]: (lt, gt), afterwards
+            lst[start:lt] < pivot, lst[lt:gt] == pivot, lst[gt:end] > pivot
+    '''
+    lt = i = start
+    gt = end
+    while i < gt:
+        x = lst[i]
+        if x < pivot:
+            lst[i], lst[lt] = lst[lt], x
+            lt += 1
+            i += 1
+        elif pivot < x:
+            gt -= 1
+            lst[i], lst[gt] = lst[gt], x
+        else:
+            i += 1
+    return (lt, gt)
+
+def insertionSortRange(lst: "List[int]", start: "int", end: "int") -> "None":
+    '''
+    insertion sort on lst[start:end], fast for short ranges
+
+    Returns
+    ----------
+        None: the list is sorted in place
+    '''
+    for i in range(start + 1, end):
+        x = lst[i]
+        j = i - 1
+        while j >= start and x < lst[j]:
+            lst[j + 1] = lst[j]
+            j -= 1
+        lst[j + 1] = x
+
+def heapSortRange(lst: "List[int]", start: "int", end: "int") -> "None":
+    '''
+    heap sort on lst[start:end], O(n log n) whatever the input
+
+    Returns
+    ----------
+        None: the list is sorted in place
+    '''
+    n = end - start
+    ## build a max heap
+    for i in range(n // 2 - 1, -1, -1):
+        _siftDown(lst, start, i, n)
+    ## move the max to the end one by one
+    for last in range(n - 1, 0, -1):
+        lst[start], lst[start + last] = lst[start + last], lst[start]
+        _siftDown(lst, start, 0, last)
+
+def _siftDown(lst: "List[int]", start: "int", i: "int", n: "int") -> "None":
+    '''
+    sift the i th element of the heap lst[start:start + n] down
+    '''
+    x = lst[start + i]
+    while True:
+        child = 2 * i + 1
+        if child >= n: break
+        if child + 1 < n and lst[start + child] < lst[start + child + 1]:
+            child += 1
+        if not x < lst[start + child]: break
+        lst[start + i] = lst[start + child]
+        i = child
+    lst[start + i] = x
+
+def quickselect(lst: "List[int]", k: "int") -> "int":
+    '''
+    find the k th smallest number (counting from 0) without sorting,
+    introselect: quick select with median of three / ninther pivots,
+    switching to median of medians pivots after 2 * log2(n) rounds
+    so the worst case stays O(n)
+
+    Params
+    ----------
+        lst List[int]: the list, rearranged in place so that
+            lst[:k] <= lst[k] <= lst[k + 1:]
+        k int: rank of the number to find
+
+    Returns
+    ----------
+        int: the k th smallest number
+    '''
+    if not 0 <= k < len(lst):
+        raise IndexError(f"k = {k} out of range for {len(lst)} numbers")
+    selectRange(lst, 0, len(lst), k)
+    return lst[k]
+
+def selectRange(lst: "List[int]", start: "int", end: "int", k: "int") -> "None":
+    '''
+    introselect on lst[start:end], puts the number of rank k
+    (an index of the whole list) at index k
+
+    Returns
+    ----------
+        None: the list is rearranged in place
+    '''
+    depth = 2 * (end - start).bit_length()
+    while end - start > INSERTION_CUTOFF:
+        if depth > 0:
+            depth -= 1
+            pivot = choosePivot(lst, start, end)
+        else:
+            ## too many bad pivots, take a guaranteed good one
+            pivot = medianOfMedians(lst, start, end)
+        (lt, gt) = partition3(lst, start, end, pivot)
+        ## only keep the side that has k
+        if k < lt:
+            end = lt
+        elif k >= gt:
+            start = gt
+        else:
+            return
+    insertionSortRange(lst, start, end)
+
+def medianOfMedians(lst: "List[int]", start: "int", end: "int") -> "int":
+    '''
+    median of the medians of groups of 5,
+    at least 30% of lst[start:end] is on each side of it
+
+    Returns
+    ----------
+        int: the pivot value
+    '''
+    medians = []
+    for i in range(start, end, 5):
+        group = sorted(lst[i:min(i + 5, end)])
+        medians.append(group[(len(group) - 1) // 2])
+    selectRange(medians, 0, len(medians), len(medians) // 2)
+    return medians[len(medians) // 2]
+
+def partial_sort(lst: "List[int]", k: "int") -> "None":
+    '''
+    put the k smallest numbers in order at the front of the list,
+    O(n + k log k), the rest is left in no particular order
+
+    Params
+    ----------
+        lst List[int]: the list
+        k int: number of smallest numbers to sort
+
+    Returns
+    ----------
+        None: the list is rearranged in place
+    '''
+    n = len(lst)
+    k = min(k, n)
+    if k <= 0: return
+    if k < n:
+        selectRange(lst, 0, n, k - 1)
+    introSortHelper(lst, 0, k)
+
+class _Reverse():
+    '''
+    wrapper that flips the order, turns heapq into a max heap
+    '''
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: "Any") -> "None":
+        self.obj = obj
+
+    def __lt__(self, other: "_Reverse") -> "bool":
+        return other.obj < self.obj
+
+def nsmallest(
+    iterable: "Iterable[Any]",
+    k: "int",
+    key: "Optional[Callable[[Any], Any]]"=None
+) -> "List[Any]":
+    '''
+    the k smallest items of a stream, keeping only k of them in a heap,
+    O(n log k) time and O(k) memory
+
+    Params
+    ----------
+        iterable Iterable[Any]: the items, read once
+        k int: number of items to keep
+        key Optional[Callable[[Any], Any]]: compare key(item)
+
+    Returns
+    ----------
+        List[Any]: the k smallest items in order,
+            same as sorted(iterable, key=key)[:k]
+    '''
+    if k <= 0: return []
+    ## max heap, the largest (and latest on ties) kept item on top
+    heap = []
+    for (idx, item) in enumerate(iterable):
+        kv = key(item) if key else item
+        if len(heap) < k:
+            heapq.heappush(heap, (_Reverse((kv, idx)), item))
+        elif kv < heap[0][0].obj[0]:
+            heapq.heapreplace(heap, (_Reverse((kv, idx)), item))
+    heap.sort(key=lambda e: e[0].obj)
+    return [item for (_, item) in heap]
+
+def nlargest(
+    iterable: "Iterable[Any]",
+    k: "int",
+    key: "Optional[Callable[[Any], Any]]"=None
+) -> "List[Any]":
+    '''
+    the k largest items of a stream, keeping only k of them in a heap,
+    O(n log k) time and O(k) memory
+
+    Params
+    ----------
+        iterable Iterable[Any]: the items, read once
+        k int: number of items to keep
+        key Optional[Callable[[Any], Any]]: compare key(item)
+
+    Returns
+    ----------
+        List[Any]: the k largest items in order,
+            same as sorted(iterable, key=key, reverse=True)[:k]
+    '''
+    if k <= 0: return []
+    ## min heap, the smallest (and latest on ties) kept item on top
+    heap = []
+    for (idx, item) in enumerate(iterable):
+        kv = key(item) if key else item
+        if len(heap) < k:
+            heapq.heappush(heap, ((kv, -idx), item))
+        elif heap[0][0][0] < kv:
+            heapq.heapreplace(heap, ((kv, -idx), item))
+    heap.sort(key=lambda e: e[0], reverse=True)
+    return [item for (_, item) in heap]
+
+class P2Quantile():
+    '''
+    streaming estimate of a quantile with the P-square algorithm,
+    O(1) memory and time per number whatever the length of the stream
+    five markers track the minimum, the p / 2, p, (1 + p) / 2 quantiles
+    and the maximum, the middle ones are moved along a parabola
+    fitted through their neighbors as numbers come in
+    '''
+    def __init__(self, p: "float") -> "None":
+        if not 0 <= p <= 1:
+            raise ValueError(f"p = {p} is not between 0 and 1")
+        self.p = p
+        self.count = 0
+        ## heights and positions of the markers
+        self.q = []
+        self.pos = [0, 1, 2, 3, 4]
+        ## desired positions and how much they move per number
+        self.want = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.step = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: "float") -> "None":
+        '''
+        take one more number into account
+        '''
+        self.count += 1
+        q, pos = self.q, self.pos
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+        ## find the cell x falls in, stretching the ends if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self.want[i] += self.step[i]
+        ## move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self.want[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) \
+                    or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                d = 1 if d > 0 else -1
+                h = q[i] + d / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + d) * (q[i + 1] - q[i])
+                    / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - d) * (q[i] - q[i - 1])
+                    / (pos[i] - pos[i - 1])
+                )
+                if not q[i - 1] < h < q[i + 1]:
+                    ## parabola overshoots, go linear
+                    h = q[i] + d * (q[i + d] - q[i]) / (pos[i + d] - pos[i])
+                q[i] = h
+                pos[i] += d
+
+    def update(self, iterable: "Iterable[float]") -> "P2Quantile":
+        '''
+        take every number of a stream into account
+        '''
+        for x in iterable:
+            self.add(x)
+        return self
+
+    def value(self) -> "float":
+        '''
+        current estimate, exact while there are at most 5 numbers
+        '''
+        if not self.count:
+            raise ValueError("no number seen yet")
+        if self.count <= 5:
+            return self.q[round(self.p * (self.count - 1))]
+        return self.q[2]
+
 if __name__ == "__main__":
     test1 = [2, 5, 1, 3]
     quickSort(test1)
@@ -144,6 +566,14 @@ if __name__ == "__main__":
     test4 = []
     quickSort(test4)
     print(test4)
+    test5 = [random.randint(0, 9) for _ in range(50)]
+    quickSort(test5, intro=True)
+    print(test5)
+    test6 = [random.randint(0, 99) for _ in range(50)]
+    print(quickselect(test6, 25), sorted(test6)[25])
+    partial_sort(test6, 5)
+    print(test6[:5], nsmallest(test6, 5), nlargest(test6, 5))
+    print(P2Quantile(0.5).update(random.random() for _ in range(100000)).value())
     # ## test array access vs. append
     # test_ = [2, 7, 2, 9, 4, 8, 3 ,67, 7845, 23, 65, 789, 234, 58,12, 976]
     # test = []
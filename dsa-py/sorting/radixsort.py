@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import time
+from array import array
+from typing import Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError: ## radix and counting sort are unavailable without numpy
+    np = None
+
+## key ranges up to this size go to counting sort
+COUNTING_RANGE: "int" = 1 << 16
+
+def _asKeys(keys: "Union[Sequence[int], array, np.ndarray]") -> "np.ndarray":
+    '''
+    view the keys as a 1D numpy array without copying when possible,
+    array.array and numpy buffers are used directly
+    '''
+    if np is None:
+        raise ImportError("radix and counting sort require numpy")
+    arr = np.asarray(keys)
+    if arr.ndim != 1:
+        arr = arr.reshape(-1)
+    if arr.dtype.kind not in "iuMm":
+        raise TypeError(f"cannot radix sort keys of type {arr.dtype}")
+    return arr
+
+def _unsigned(arr: "np.ndarray") -> "np.ndarray":
+    '''
+    map fixed width keys to unsigned 64 bit integers in the same order,
+    signed integers and timestamps get their sign bit flipped
+    '''
+    if arr.dtype.kind == "u":
+        return arr.astype(np.uint64)
+    flip = np.uint64(1 << 63)
+    return arr.astype(np.int64).view(np.uint64) ^ flip
+
+def _digitBits(n: "int") -> "int":
+    '''
+    bits per digit, wider digits mean fewer passes
+    but a bigger histogram, worth it only for longer inputs
+    numpy scatters 16 bit digits one byte at a time anyway,
+    so digits in between (like 11 bits) would not save a pass
+    '''
+    if n < 1 << 16: return 8
+    return 16
+
+def _fromUnsigned(u: "np.ndarray", dtype: "np.dtype") -> "np.ndarray":
+    '''
+    undo _unsigned
+    '''
+    if dtype.kind == "u":
+        return u.astype(dtype)
+    signed = (u ^ np.uint64(1 << 63)).view(np.int64)
+    return signed.astype(dtype) if dtype.kind == "i" else signed.view(dtype)
+
+def countingSort(
+    keys: "Union[Sequence[int], array, np.ndarray]",
+    argsort: "bool"=False
+) -> "Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]":
+    '''
+    sort integer keys from a small range by counting them,
+    O(n + range), wider ranges are handed to radixSort
+    so the count array never outgrows the input
+
+    Params
+    ----------
+        keys Sequence[int] | array | np.ndarray: fixed width integer keys
+        argsort bool: also return the permutation that sorts the keys
+
+    Returns
+    ----------
+        np.ndarray : sorted copy of the keys,
+            with the stable permutation (keys[perm] is sorted) if argsort
+    '''
+    arr = _asKeys(keys)
+    if not len(arr):
+        return (arr.copy(), np.arange(0)) if argsort else arr.copy()
+    u = _unsigned(arr)
+    low = u.min()
+    offset = u - low
+    span = int(offset.max())
+    if span >= COUNTING_RANGE and (argsort or span >= len(arr)):
+        return radixSort(arr, argsort)
+    if argsort:
+        ## stable, numpy sorts 16 bit integers with a counting pass
+        perm = np.argsort(offset.astype(np.uint16), kind="stable")
+        return (arr[perm], perm)
+    counts = np.bincount(offset.astype(np.int64))
+    ## every value repeated as many times as it was counted
+    values = np.repeat(np.arange(len(counts), dtype=np.uint64) + low, counts)
+    return _fromUnsigned(values, arr.dtype)
+
+def radixSort(
+    keys: "Union[Sequence[int], array, np.ndarray]",
+    argsort: "bool"=False
+) -> "Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]":
+    '''
+    LSD radix sort of fixed width integer keys (int, uint, datetime64)
+    small key ranges go to countingSort, otherwise one stable pass
+    per 8 or 16 bit digit, from the least significant up,
+    passes over digits that are the same for every key are skipped
+    each pass histograms the digit with bincount, then leaves the
+    stable scatter to numpy's argsort(kind="stable"), which for
+    8 and 16 bit integers is itself a counting sort, so a pass is O(n)
+
+    Params
+    ----------
+        keys Sequence[int] | array | np.ndarray: fixed width integer keys
+        argsort bool: also return the permutation that sorts the keys,
+            to reorder records that go with them
+
+    Returns
+    ----------
+        np.ndarray : sorted copy of the keys,
+            with the stable permutation (keys[perm] is sorted) if argsort
+    '''
+    arr = _asKeys(keys)
+    n = len(arr)
+    u = _unsigned(arr)
+    low = u.min() if n else np.uint64(0)
+    u = u - low
+    span = int(u.max()) if n else 0
+    if span < COUNTING_RANGE:
+        return countingSort(arr, argsort)
+    bits = _digitBits(n)
+    mask = np.uint64((1 << bits) - 1)
+    dtype = np.uint8 if bits <= 8 else np.uint16
+    perm = np.arange(n, dtype=np.int64)
+    for shift in range(0, span.bit_length(), bits):
+        digit = ((u >> np.uint64(shift)) & mask).astype(dtype)
+        counts = np.bincount(digit, minlength=1 << bits)
+        ## every key has the same digit, nothing moves
+        if counts.max() == n: continue
+        ## stable counting sort by this digit,
+        ## numpy sorts 8 and 16 bit integers with a counting pass
+        order = np.argsort(digit, kind="stable")
+        perm = perm[order]
+        u = u[order]
+    out = _fromUnsigned(u + low, arr.dtype)
+    return (out, perm) if argsort else out
+
+
+if __name__ == "__main__":
+    test1 = array("q", [5, -3, 2, 9, -3, 0])
+    print(radixSort(test1))
+    print(radixSort(test1, argsort=True))
+    test2 = [2**40, 3, 2**33, 7, 2**40 + 1]
+    print(radixSort(test2))
+    if np is not None:
+        rng = np.random.default_rng(0)
+        for n in [10**5, 10**6, 10**7]:
+            keys = rng.integers(-2**62, 2**62, n)
+            start = time.time()
+            radixSort(keys)
+            end = time.time()
+            print(f"radix sort {n}: {end - start:.4f}")
+            start = time.time()
+            np.sort(keys)
+            end = time.time()
+            print(f"numpy sort {n}: {end - start:.4f}")
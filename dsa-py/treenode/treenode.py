@@ -1,8 +1,56 @@
 # -*- coding: utf-8 -*-
 
-from typing import Optional, List
+from array import array
+from collections import deque
+from typing import Optional, List, Tuple, Union
+
+def parse_level_order(
+    lst: "List[Optional[Union[int, float]]]"
+) -> "Tuple[List[Union[int, float]], array, array]":
+    '''
+    read the level order list written by TreeNode.__str__ and
+    ArrayTree.to_list, None only for the missing children of nodes,
+    shared by both so a printed tree of either kind loads back as is
+
+    Params
+    ----------
+        lst List[Optional[Union[int, float]]]: the tree as a list
+
+    Returns
+    ----------
+        Tuple[List[Union[int, float]], array, array]: the values
+            of the nodes in the order they appear in the list and
+            the index of the left and right child of each, -1 for none
+    '''
+    vals = []
+    (left, right) = (array("i"), array("i"))
+    if not lst or lst[0] is None: return (vals, left, right)
+
+    def add(val: "Union[int, float]") -> "int":
+        vals.append(val)
+        left.append(-1)
+        right.append(-1)
+        return len(vals) - 1
+
+    q = deque([add(lst[0])])
+    (i, n) = (1, len(lst))
+    while i < n:
+        if not q:
+            raise ValueError(f"item {i} has no parent")
+        parent = q.popleft()
+        if lst[i] is not None:
+            left[parent] = add(lst[i])
+            q.append(left[parent])
+        if i + 1 < n and lst[i + 1] is not None:
+            right[parent] = add(lst[i + 1])
+            q.append(right[parent])
+        i += 2
+    return (vals, left, right)
 
 class TreeNode:
+    ## no per node __dict__, about half the memory on big trees
+    __slots__ = ("val", "left", "right")
+
     def __init__(
         self,
         val: "int"=0,
@@ -14,53 +62,30 @@ class TreeNode:
         self.right = right
     
     def __str__(self):
-        ## TODO might want to implement with list in the future
-        q = []
-        level = 0
-        if self: q.append(self)
+        ## level order with None only for the missing children of
+        ## nodes, trailing None dropped, same as ArrayTree.to_list
+        ## one BFS, each node and each missing child written once,
+        ## so the output is O(n) whatever the shape of the tree
+        vals: "List[Optional[int]]" = []
+        q = deque([self])
         while q:
-            qsize = len(q)
-            for _ in range(qsize):
-                cur = q.pop(0)
-                if cur.left: q.append(cur.left)
-                if cur.right: q.append(cur.right)
-            level += 1
-        ans = "[" + str(self.val)
-        q.append(self.left)
-        q.append(self.right)
-        cur_level = 1
-        while q and cur_level < level:
-            qsize = len(q)
-            for _ in range(qsize):
-                cur = q.pop(0)
-                if cur:
-                    ans += ", " + str(cur.val)
-                    q.append(cur.left)
-                    q.append(cur.right)
-                else:
-                    ans += ", None"
-                    q.append(None)
-                    q.append(None)
-            cur_level += 1
-        ans += "]"
-        return ans
+            cur = q.popleft()
+            if cur is None:
+                vals.append(None)
+                continue
+            vals.append(cur.val)
+            q.append(cur.left)
+            q.append(cur.right)
+        while vals[-1] is None:
+            vals.pop()
+        return "[" + ", ".join(map(str, vals)) + "]"
 
     @classmethod
     def fromList(cls, lst: "List[int]") -> "Optional[TreeNode]":
-        if not lst: return None
-        n = len(lst)
-        if not n: return None
-        ans: "List[TreeNode]" = [None] * n
-        ans[0] = TreeNode(lst[0]) if lst[0] else None
-        for i in range(1, n):
-            if lst[i] != None:
-                if ans[(i - 1) // 2]:
-                    ans[i] = TreeNode(lst[i])
-                    if i % 2 == 1:
-                        ans[(i - 1) // 2].left = ans[i]
-                    else:
-                        ans[(i - 1) // 2].right = ans[i]
-                else:
-                    print("Invalid Input")
-                    return None
-        return ans[0]
\ No newline at end of file
+        ## the level order of __str__, so str and fromList round trip
+        (vals, left, right) = parse_level_order(lst)
+        nodes = [TreeNode(v) for v in vals]
+        for (i, node) in enumerate(nodes):
+            if left[i] >= 0: node.left = nodes[left[i]]
+            if right[i] >= 0: node.right = nodes[right[i]]
+        return nodes[0] if nodes else None